@@ -0,0 +1,159 @@
+"""Time and memory-profile each stage of the dashboard pipeline on synthetic data
+
+Run from the repository root, e.g.:
+
+    python benchmarks/bench_pipeline.py --tickers 30 500 --years 1 5 --output results.jsonl
+
+Each line of the output is a JSON record with the stage, the number of tickers, the number of years, the best
+wall-clock time over the repeats and the peak memory traced while the stage ran.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from growth_ptf_maker.backtest import BackTest  # noqa: E402
+from growth_ptf_maker.component_weights import GrowthAndWeights  # noqa: E402
+from growth_ptf_maker.data_providers import SyntheticDataProvider  # noqa: E402
+from growth_ptf_maker.market_data import MarketData  # noqa: E402
+from growth_ptf_maker.performance import Performance  # noqa: E402
+from growth_ptf_maker.price_panel import PricePanel  # noqa: E402
+from growth_ptf_maker.returns_engine import ReturnsEngine  # noqa: E402
+from growth_ptf_maker.risk_metrics import RiskMetrics  # noqa: E402
+
+DEFAULT_TICKERS = (30, 500, 3000, 10000)
+DEFAULT_YEARS = (1, 5, 20)
+
+
+class PipelineBenchmark:
+    """Benchmark the stages of the pipeline for one universe size and one back-test window"""
+
+    def __init__(self, tickers_count, years, repeat=3, seed=0, data_provider=None):
+        """
+        Initialize the class with the given inputs
+        :param int tickers_count: number of synthetic tickers
+        :param int years: years of the back-test window
+        :param int repeat: number of runs of each stage, the best time is reported
+        :param int seed: seed of the synthetic data, unused if a data_provider is given
+        :param SyntheticDataProvider data_provider: provider shared by the grid, with an origin date before the
+        back-test window (a new one starting on the window if None)
+        """
+        self.__tickers_count = tickers_count
+        self.__years = years
+        self.__repeat = repeat
+        self.__start_date = str(datetime.today() - timedelta(days=(years * 365)))
+        self.__data_provider = data_provider or SyntheticDataProvider(seed=seed, origin_date=self.__start_date)
+        self.__tickers = self.__data_provider.get_tickers(tickers_count)
+        self.__growth_rates = self.__data_provider.get_growth_rates(self.__tickers)
+
+    def __measure(self, stage, function):
+        """
+        Run a stage several times, tracing its best time and its peak memory
+        :param str stage: name of the stage
+        :param callable function: function running the stage
+        :return: a tuple with the benchmark record and the result of the last run
+        :rtype: tuple
+        """
+        timings = list()
+        for _ in range(self.__repeat):
+            start_time = time.perf_counter()
+            result = function()
+            timings.append(time.perf_counter() - start_time)
+        tracemalloc.start()
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        record = {
+            "stage": stage,
+            "tickers": self.__tickers_count,
+            "years": self.__years,
+            "best_seconds": min(timings),
+            "mean_seconds": sum(timings) / len(timings),
+            "peak_memory_bytes": peak_memory
+        }
+        return record, result
+
+    def run(self):
+        """
+        Run all the stages in the pipeline order
+        :return: a list of benchmark records
+        :rtype: list
+        """
+        records = list()
+        market_data = MarketData(self.__start_date, data_provider=self.__data_provider)
+        market_data.load(self.__tickers)
+        historical_data = {i: market_data.get_prices(i, self.__start_date) for i in self.__tickers}
+
+        record, weights = self.__measure("weighting", lambda: GrowthAndWeights.calculate_weights(self.__growth_rates))
+        records.append(record)
+
+        record, panel = self.__measure("panel_assembly", lambda: PricePanel(historical_data, weights.index).get_panel())
+        records.append(record)
+
+        record, _ = self.__measure("returns", lambda: ReturnsEngine(panel, weights["weights"]).get_results())
+        records.append(record)
+
+        record, back_test = self.__measure("back_test", lambda: BackTest(self.__tickers, weights, self.__years,
+                                                                         market_data))
+        records.append(record)
+
+        record, _ = self.__measure("risk_metrics", lambda: RiskMetrics(back_test).results)
+        records.append(record)
+
+        record, _ = self.__measure("performance", lambda: Performance(self.__start_date, None, market_data,
+                                                                      weights=weights).portfolio_returns())
+        records.append(record)
+        return records
+
+
+def main():
+    """
+    Parse the command line and run the benchmark grid
+    :return: the exit code
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, nargs="+", default=DEFAULT_TICKERS, help="universe sizes")
+    parser.add_argument("--years", type=int, nargs="+", default=DEFAULT_YEARS, help="back-test windows in years")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each stage, the best time is reported")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic data")
+    parser.add_argument("--output", help="JSON lines file to append the results to (stdout if omitted)")
+    arguments = parser.parse_args()
+
+    environment = {"python": platform.python_version(), "machine": platform.machine(),
+                   "timestamp": datetime.now().isoformat()}
+    output = open(arguments.output, "a") if arguments.output else sys.stdout
+    working_directory = os.getcwd()
+    # one provider for the whole grid generates the path of each ticker once, for the longest window
+    origin_date = str(datetime.today() - timedelta(days=max(arguments.years) * 365))
+    data_provider = SyntheticDataProvider(seed=arguments.seed, origin_date=origin_date,
+                                          path_cache_size=max(arguments.tickers))
+    try:
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            os.chdir(temporary_directory)
+            for tickers_count in arguments.tickers:
+                for years in arguments.years:
+                    benchmark = PipelineBenchmark(tickers_count, years, arguments.repeat, arguments.seed,
+                                                  data_provider)
+                    for record in benchmark.run():
+                        record.update(environment)
+                        output.write(json.dumps(record) + "\n")
+                        output.flush()
+    finally:
+        os.chdir(working_directory)
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
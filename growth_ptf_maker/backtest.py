@@ -1,25 +1,28 @@
 """Download historical data and Back-Test the created portfolio"""
 
 from datetime import datetime, timedelta
-from functools import reduce
 
-import pandas as pd
-
-from .yahoo_data_downloader import YahooFinanceDownloader
+from .market_data import MarketData
+from .price_panel import PricePanel
+from .returns_engine import ReturnsEngine
 
 
 class BackTest:
     """Back-Test the created portfolio"""
 
-    def __init__(self, tickers, weights, years=1):
+    def __init__(self, tickers, weights, years=1, market_data=None, join="inner"):
         """
         Initialize the class
         :param list tickers: list of tickers to get historical data from
         :param pd.DataFrame weights: DataFrame with the weights of the components
         :param int years: years to back-test
+        :param MarketData market_data: market data shared by the session (a new session is created if None)
+        :param str join: alignment policy of the dates of the components, one of "inner", "outer" or "ffill"
         """
         self.__years = int(years)
         self.__weights = weights
+        self.__market_data = market_data
+        self.__join = join
         self.__historical_data = self.__download_historical_data(tickers, self.__years)
         self.__formatted_data = self.__format_and_reshape_historical_data()
         self.__portfolio_historical_returns = self.__calculate_portfolio_returns()
@@ -29,29 +32,25 @@ class BackTest:
         Back-test the created portfolio to evaluate the performance of the Zero-Investment Portfolio
         :param list tickers: list of tickers to get historical data from
         :param int years: years to back-test
-        :return: a list of object with Pandas DataFrame of historical data for each ticker
-        :rtype: list
+        :return: a dictionary with a Pandas DataFrame of historical data for each ticker
+        :rtype: dict
         """
         start_date = str(datetime.today() - timedelta(days=(years * 365)))
-        historical_data = [{i: YahooFinanceDownloader(i, start_date).get_parsed_results()} for i in tickers]
+        if self.__market_data is None:
+            self.__market_data = MarketData(start_date)
+        self.__market_data.load(tickers)
+        historical_data = {i: self.__market_data.get_prices(i, start_date) for i in tickers}
         return historical_data
 
     def __format_and_reshape_historical_data(self):
         """
         Format and reshape the downloaded historical data
-        :return: a Pandas DataFrame with the data
+        :return: a Pandas DataFrame with the prices of the components in the weights
         :rtype: pd.DataFrame
         """
-        formatted_data = list()
-        for series in self.__historical_data:
-            for ticker in series:
-                if ticker in self.__weights.index.tolist():
-                    temp_df = series[ticker][["Date", "Adj Close"]]
-                    temp_df.columns = ["Date", ticker]
-                    formatted_data.append(temp_df)
-        merged_series = reduce(lambda x, y: pd.merge(x, y, on="Date"), formatted_data)
-        merged_series.set_index("Date", inplace=True)
-        return merged_series
+        price_panel = PricePanel(self.__historical_data, self.__weights.index, self.__join)
+        self.__dropped_tickers = price_panel.get_dropped_tickers()
+        return price_panel.get_panel()
 
     def __calculate_portfolio_returns(self):
         """
@@ -59,12 +58,7 @@ class BackTest:
         :return: a DataFrame with the portfolio returns
         :rtype: pd.DataFrame
         """
-        components_return = self.__formatted_data.pct_change()
-        for ticker in components_return.columns:
-            components_return[ticker] = (components_return[ticker] * self.__weights["weights"][ticker]) + 1
-        components_return["Portfolio"] = components_return.product(axis=1)
-        components_return["Portfolio_Dollars"] = components_return["Portfolio"].cumprod() * 100
-        return components_return
+        return ReturnsEngine(self.__formatted_data, self.__weights["weights"]).get_results()
 
     def get_back_test_results(self):
         """
@@ -81,3 +75,11 @@ class BackTest:
         :rtype: pd.DataFrame
         """
         return self.__weights
+
+    def get_dropped_tickers(self):
+        """
+        Return the tickers left out of the price matrix
+        :return: a dictionary with the reason for each dropped ticker
+        :rtype: dict
+        """
+        return self.__dropped_tickers
@@ -0,0 +1,140 @@
+"""Render the portfolio charts to files without a display"""
+
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+FORMATS = ("png", "svg")
+DEFAULT_FIGSIZE = (6.4, 4.8)
+
+
+def _draw_chart(axes, chart):
+    """
+    Draw a precomputed chart on the given axes
+    :param matplotlib.axes.Axes axes: axes to draw on
+    :param dict chart: kind, data, title, grid and opacity of the chart, as built by PortfolioAnalytics
+    :return: the chart drawn on the axes
+    :rtype: None
+    """
+    data = chart["data"].to_frame() if chart["data"].ndim == 1 else chart["data"]
+    if chart["kind"] == "line":
+        for column in data.columns:
+            axes.plot(data.index, data[column].to_numpy(dtype=float), label=str(column), alpha=chart["alpha"])
+    elif chart["kind"] == "hist":
+        values = [data[column].dropna().to_numpy(dtype=float) for column in data.columns]
+        bins = np.histogram_bin_edges(np.concatenate(values), bins=10) if any(len(i) for i in values) else 10
+        for column, column_values in zip(data.columns, values):
+            axes.hist(column_values, bins=bins, label=str(column), alpha=chart["alpha"])
+    elif chart["kind"] in ("bar", "barh"):
+        positions = np.arange(len(data))
+        bar = axes.bar if chart["kind"] == "bar" else axes.barh
+        bar(positions, data.iloc[:, 0].to_numpy(dtype=float), alpha=chart["alpha"])
+        if chart["kind"] == "bar":
+            axes.set_xticks(positions, data.index.astype(str), rotation=90)
+        else:
+            axes.set_yticks(positions, data.index.astype(str))
+    else:
+        raise ValueError(f"Unknown chart kind '{chart['kind']}'")
+    if chart["kind"] in ("line", "hist") and len(data.columns) > 1:
+        axes.legend()
+    if chart["title"]:
+        axes.set_title(chart["title"])
+    axes.grid(chart["grid"])
+
+
+def _render_batch(jobs, dpi):
+    """
+    Render a batch of charts reusing a single Agg figure, without importing pyplot
+    :param list jobs: list of (chart, file paths) tuples
+    :param int dpi: resolution of the raster files
+    :return: the list of the written file paths
+    :rtype: list
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    written_paths = list()
+    for chart, file_paths in jobs:
+        figure.clear()
+        figure.set_size_inches(chart["figsize"] or DEFAULT_FIGSIZE)
+        _draw_chart(figure.add_subplot(), chart)
+        for file_path in file_paths:
+            figure.savefig(file_path, dpi=dpi)
+            written_paths.append(file_path)
+    return written_paths
+
+
+class ChartRenderer:
+    """Render the precomputed charts of one or many portfolios to PNG or SVG files with the Agg backend"""
+
+    def __init__(self, output_dir=None, formats=("png",), dpi=100, max_workers=1):
+        """
+        Initialize the class with the given inputs
+        :param str output_dir: folder of the rendered charts (defaults to ./charts)
+        :param tuple formats: file formats of the charts, among "png" and "svg"
+        :param int dpi: resolution of the raster files
+        :param int max_workers: number of processes rendering the charts (1 renders them in the current process)
+        """
+        unknown_formats = set(formats).difference(FORMATS)
+        if unknown_formats:
+            raise ValueError(f"Unknown formats {', '.join(sorted(unknown_formats))}, expected {', '.join(FORMATS)}")
+        self.__output_dir = output_dir or os.path.join(os.getcwd(), "charts")
+        self.__formats = tuple(formats)
+        self.__dpi = dpi
+        self.__max_workers = max(1, int(max_workers))
+
+    def __build_jobs(self, portfolios):
+        """
+        Create the folders of the portfolios and list the files of each chart
+        :param dict portfolios: chart data of each portfolio keyed by the name of its folder, None for the output folder
+        :return: a tuple with the list of (chart, file paths) jobs and the file paths of each chart of each portfolio
+        :rtype: tuple
+        """
+        jobs = list()
+        file_paths = dict()
+        for portfolio, chart_data in portfolios.items():
+            portfolio_dir = os.path.join(self.__output_dir, portfolio) if portfolio is not None else self.__output_dir
+            os.makedirs(portfolio_dir, exist_ok=True)
+            file_paths[portfolio] = dict()
+            for name, chart in chart_data.items():
+                chart_paths = [os.path.join(portfolio_dir, f"{name}.{i}") for i in self.__formats]
+                file_paths[portfolio][name] = chart_paths
+                jobs.append((chart, chart_paths))
+        return jobs, file_paths
+
+    def render_many(self, portfolios):
+        """
+        Render the charts of many portfolios, each in its own folder, splitting them in one batch per process
+        :param dict portfolios: chart data of each portfolio (see PortfolioAnalytics.get_chart_data), keyed by name
+        :return: a dictionary with the file paths of each chart of each portfolio
+        :rtype: dict
+        """
+        jobs, file_paths = self.__build_jobs(portfolios)
+        batches = [jobs[i::self.__max_workers] for i in range(self.__max_workers) if jobs[i::self.__max_workers]]
+        if len(batches) <= 1:
+            for batch in batches:
+                _render_batch(batch, self.__dpi)
+        else:
+            with ProcessPoolExecutor(max_workers=len(batches)) as executor:
+                list(executor.map(_render_batch, batches, [self.__dpi] * len(batches)))
+        return file_paths
+
+    def render(self, chart_data):
+        """
+        Render the charts of a single portfolio in the output folder
+        :param dict chart_data: chart data of the portfolio (see PortfolioAnalytics.get_chart_data)
+        :return: a dictionary with the file paths of each chart
+        :rtype: dict
+        """
+        return self.render_many({None: chart_data})[None]
+
+    def get_output_dir(self):
+        """
+        Get the folder of the rendered charts
+        :return: the path of the output folder
+        :rtype: str
+        """
+        return self.__output_dir
@@ -1,25 +1,40 @@
 """Component Weights and Growth calculator"""
 
-import os
-
 import pandas as pd
 
-from scipy.stats import norm
-
 from .datashelf import DataShelf
 from .growth_calculator import CalculateG
+from .results_store import ResultsStore
+from .weighting_engine import WeightingEngine
 
 
 class GrowthAndWeights:
     """Class to calculate the growth and weights for the stocks in input"""
 
-    def __init__(self):
-        """Initialize the class with the given inputs"""
-        self.__ticker_list = DataShelf().get_ticker_list()
-        self.__growth_rates = CalculateG(self.__ticker_list).get_growth_rates()
+    def __init__(self, tickers=None, growth_rates=None, metrics=None, results_store=None, weighting_engine=None,
+                 save_results=True):
+        """
+        Initialize the class with the given inputs
+        :param list tickers: list of tickers of the portfolio (the DataShelf tickers if None)
+        :param dict growth_rates: growth rate of each ticker (inferred with CalculateG if None)
+        :param Metrics metrics: metrics of the growth inference (not recorded if None)
+        :param ResultsStore results_store: store of the growth rates and of the weights (defaults to ./results_store)
+        :param WeightingEngine weighting_engine: engine mapping the growth rates to the weights (z-score if None)
+        :param bool save_results: save the growth rates and the first weights in the results store
+        """
+        self.__ticker_list = tickers if tickers is not None else DataShelf().get_ticker_list()
+        self.__growth_rates = growth_rates if growth_rates is not None else \
+            CalculateG(self.__ticker_list, metrics=metrics).get_growth_rates()
+        self.__weighting_engine = weighting_engine
         self.__component_weights = self.__calculate_component_weight()
-        if not os.path.isfile("weights.csv"):
-            self.__component_weights.to_csv("weights.csv")
+        self.__results_store = results_store or (ResultsStore() if save_results else None)
+        if self.__results_store is None:
+            return
+        self.__results_store.save(ResultsStore.GROWTH_RATES,
+                                  pd.DataFrame(index=list(self.__growth_rates.keys()),
+                                               data={"g": list(self.__growth_rates.values())}))
+        if not self.__results_store.has(ResultsStore.WEIGHTS):
+            self.__results_store.save(ResultsStore.WEIGHTS, self.__component_weights)
 
     def __calculate_component_weight(self):
         """
@@ -27,12 +42,18 @@ class GrowthAndWeights:
         :return: a Pandas DataFrame with the calculated weights
         :rtype: pd.DataFrame
         """
-        growth_df = pd.DataFrame(index=list(self.__growth_rates.keys()), data={"g": list(self.__growth_rates.values())})
-        growth_df.dropna(inplace=True)
-        growth_df["z-score"] = (growth_df["g"] - growth_df["g"].mean()) / growth_df["g"].std()
-        growth_df["cdf"] = norm.cdf(growth_df["z-score"])
-        growth_df["weights"] = growth_df["cdf"] - 0.5
-        return growth_df
+        return self.calculate_weights(self.__growth_rates, self.__weighting_engine)
+
+    @staticmethod
+    def calculate_weights(growth_rates, weighting_engine=None):
+        """
+        Standardize the growth rates and map them to the weights of a Zero-Investment Portfolio
+        :param dict growth_rates: dictionary with the growth rate of each ticker
+        :param WeightingEngine weighting_engine: engine mapping the growth rates to the weights (z-score if None)
+        :return: a Pandas DataFrame with the calculated weights
+        :rtype: pd.DataFrame
+        """
+        return (weighting_engine or WeightingEngine()).get_weights_table(growth_rates)
 
     def get_ticker_list(self):
         """
@@ -60,8 +81,8 @@ class GrowthAndWeights:
 
     def update_weights(self):
         """
-        Replace the weights CSV file with the current calculated weights
-        :return: a saved CSV file
-        :rtype: csv
+        Save the current calculated weights as the latest version of the weights in the results store
+        :return: the path of the saved weights
+        :rtype: str
         """
-        return self.__component_weights.to_csv("weights.csv")
+        return (self.__results_store or ResultsStore()).save(ResultsStore.WEIGHTS, self.__component_weights)
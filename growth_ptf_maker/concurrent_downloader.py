@@ -0,0 +1,161 @@
+"""Download data from Yahoo! Finance for many tickers in parallel"""
+
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from .instrumentation import NULL_METRICS
+from .yahoo_data_downloader import YahooFinanceDownloader
+
+
+class RateLimiter:
+    """Thread-safe token bucket limiting the number of requests per second"""
+
+    def __init__(self, requests_per_second, burst=None):
+        """
+        Initialize the class with the given inputs
+        :param float requests_per_second: rate at which the tokens are refilled
+        :param int burst: maximum number of tokens in the bucket (defaults to one second of requests)
+        """
+        self.__rate = float(requests_per_second)
+        self.__capacity = float(burst or max(1, int(requests_per_second)))
+        self.__tokens = self.__capacity
+        self.__last_refill = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a token is available and consume it
+        :return: the consumed token
+        :rtype: None
+        """
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__tokens = min(self.__capacity, self.__tokens + (now - self.__last_refill) * self.__rate)
+                self.__last_refill = now
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                wait_time = (1 - self.__tokens) / self.__rate
+            time.sleep(wait_time)
+
+
+class ConcurrentDownloader:
+    """Download the data of many tickers with a bounded thread pool over one keep-alive session"""
+
+    RETRIABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(self, tickers, start_date, end_date=None, max_workers=8, requests_per_second=5, retries=3,
+                 backoff=0.5, rate_limiter=None, metrics=None, columns=None, price_dtype=None, stream=False,
+                 timeout=YahooFinanceDownloader.DEFAULT_TIMEOUT):
+        """
+        Initialize the class with the given input
+        :param list tickers: list of tickers to download the data of
+        :param str start_date: start date of the query period in a string format YYYY-MM-DD (or similar)
+        :param str end_date: end date of the query period in a string format YYYY-MM-DD (or similar)
+        :param int max_workers: maximum number of concurrent downloads
+        :param float requests_per_second: maximum number of requests sent per second
+        :param int retries: number of retries of a failed download
+        :param float backoff: seconds to wait before the first retry, doubled at every retry
+        :param RateLimiter rate_limiter: rate limiter shared with other downloaders (built if None)
+        :param Metrics metrics: metrics recording the requests, the retries and the failed tickers (if not None)
+        :param tuple columns: columns to parse, with the Date parsed to datetime64 (all the columns if None)
+        :param str price_dtype: dtype of the parsed price and volume columns, e.g. "float32" (inferred if None)
+        :param bool stream: parse each body while it is received instead of buffering it
+        :param float timeout: seconds to wait for the connection and for each read of a request before retrying it
+        """
+        self.__tickers = list(dict.fromkeys(tickers))
+        self.__start_date = start_date
+        self.__end_date = end_date
+        self.__max_workers = max(1, int(max_workers))
+        self.__retries = int(retries)
+        self.__backoff = float(backoff)
+        self.__rate_limiter = rate_limiter or RateLimiter(requests_per_second)
+        self.__metrics = metrics or NULL_METRICS
+        self.__parse_options = {"columns": columns, "price_dtype": price_dtype, "stream": stream, "timeout": timeout}
+        self.__failures = dict()
+        self.__parsed_results = self.__download_all()
+
+    def __build_session(self):
+        """
+        Build a keep-alive session with a connection pool sized on the number of workers
+        :return: the HTTP session
+        :rtype: requests.Session
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.__max_workers, pool_maxsize=self.__max_workers)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def __is_retriable(self, error):
+        """
+        Check whether a failed download is worth retrying
+        :param requests.RequestException error: the raised error
+        :return: True if the error is transient
+        :rtype: bool
+        """
+        if isinstance(error, requests.Timeout):
+            return True
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return error.response.status_code in self.RETRIABLE_STATUS_CODES
+        return True
+
+    def __download(self, ticker, session):
+        """
+        Download the data of a single ticker, retrying with exponential backoff
+        :param str ticker: ticker to download
+        :param requests.Session session: HTTP session shared by the workers
+        :return: the parsed results of the ticker
+        :rtype: pd.DataFrame
+        """
+        for attempt in range(self.__retries + 1):
+            self.__rate_limiter.acquire()
+            try:
+                return YahooFinanceDownloader(ticker, self.__start_date, self.__end_date,
+                                              session=session, metrics=self.__metrics,
+                                              **self.__parse_options).get_parsed_results()
+            except requests.RequestException as error:
+                if attempt == self.__retries or not self.__is_retriable(error):
+                    raise
+                self.__metrics.increment("download_retries")
+                time.sleep(self.__backoff * 2 ** attempt)
+
+    def __download_all(self):
+        """
+        Download the data of all the tickers in parallel
+        :return: a dictionary with the parsed results for each ticker downloaded successfully
+        :rtype: dict
+        """
+        parsed_results = dict()
+        with self.__build_session() as session, ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            futures = {ticker: executor.submit(self.__download, ticker, session) for ticker in self.__tickers}
+            for ticker, future in futures.items():
+                try:
+                    parsed_results[ticker] = future.result()
+                except Exception as error:
+                    self.__failures[ticker] = repr(error)
+                    self.__metrics.record_failure(ticker, self.__failures[ticker], "download")
+        return parsed_results
+
+    def get_parsed_results(self):
+        """
+        Get the parsed results for each ticker downloaded successfully
+        :return: a dictionary with a DataFrame for each ticker
+        :rtype: dict
+        """
+        return self.__parsed_results
+
+    def get_failures(self):
+        """
+        Get the tickers which could not be downloaded
+        :return: a dictionary with the reason of the failure for each ticker
+        :rtype: dict
+        """
+        return self.__failures
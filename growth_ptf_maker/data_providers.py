@@ -0,0 +1,235 @@
+"""Market data backends consumed by the Back-Test, the Performance and the Portfolio Analytics"""
+
+import os
+import zlib
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
+
+import dateparser
+import numpy as np
+import pandas as pd
+
+RELATIVE_BASES = (datetime(2000, 1, 1), datetime(2001, 7, 15, 12))
+
+
+class DataProvider(ABC):
+    """Interface of the market data backends, returning DataFrames with at least the Date and Adj Close columns"""
+
+    @staticmethod
+    def parse_date(date):
+        """
+        Parse a date in a string format YYYY-MM-DD (or similar) to a normalized timestamp
+        :param str date: date to parse, None meaning today
+        :return: the parsed date without the time component
+        :rtype: pd.Timestamp
+        """
+        if date is None:
+            return pd.Timestamp(datetime.today()).normalize()
+        parsed_date = DataProvider.__parse_absolute_date(str(date))
+        if parsed_date is None:
+            return pd.Timestamp(dateparser.parse(str(date))).normalize()
+        return parsed_date
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def __parse_absolute_date(date):
+        """
+        Parse a date string once, as every ticker of a session asks for the same few dates. Relative dates, like
+        "today" or "1 year ago", are not cached as they change every day
+        :param str date: date to parse
+        :return: the parsed date without the time component, or None if the date is relative or cannot be parsed
+        :rtype: pd.Timestamp
+        """
+        parsed_dates = {dateparser.parse(date, settings={"RELATIVE_BASE": i}) for i in RELATIVE_BASES}
+        if len(parsed_dates) != 1 or None in parsed_dates:
+            return None
+        return pd.Timestamp(parsed_dates.pop()).normalize()
+
+    @staticmethod
+    def slice_prices(prices, start_date, end_date):
+        """
+        Slice the prices on the requested range
+        :param pd.DataFrame prices: prices of a ticker, or None if there are none
+        :param pd.Timestamp start_date: start date of the requested period
+        :param pd.Timestamp end_date: end date of the requested period
+        :return: a DataFrame with the prices in the requested range
+        :rtype: pd.DataFrame
+        """
+        if prices is None:
+            return pd.DataFrame(columns=["Date", "Adj Close"])
+        in_range = (prices["Date"] >= start_date) & (prices["Date"] <= end_date)
+        return prices.loc[in_range].reset_index(drop=True)
+
+    @abstractmethod
+    def get_prices(self, ticker, start_date, end_date=None):
+        """
+        Get the prices of the ticker
+        :param str ticker: ticker to get the prices of
+        :param str start_date: start date of the query period in a string format YYYY-MM-DD (or similar)
+        :param str end_date: end date of the query period in a string format YYYY-MM-DD (or similar)
+        :return: a DataFrame with the prices in the requested range
+        :rtype: pd.DataFrame
+        """
+
+    def get_many_prices(self, tickers, start_date, end_date=None):
+        """
+        Get the prices of many tickers
+        :param list tickers: list of tickers to get the prices of
+        :param str start_date: start date of the query period in a string format YYYY-MM-DD (or similar)
+        :param str end_date: end date of the query period in a string format YYYY-MM-DD (or similar)
+        :return: a dictionary with the prices in the requested range for each ticker found
+        :rtype: dict
+        """
+        return {ticker: self.get_prices(ticker, start_date, end_date) for ticker in dict.fromkeys(tickers)}
+
+    def get_failures(self):
+        """
+        Get the tickers which could not be fetched
+        :return: a dictionary with the reason of the failure for each ticker
+        :rtype: dict
+        """
+        return dict()
+
+
+class LocalDirectoryProvider(DataProvider):
+    """Read the prices from a directory with one <ticker>.parquet or <ticker>.csv file per ticker"""
+
+    def __init__(self, directory):
+        """
+        Initialize the class with the given inputs
+        :param str directory: folder with the price files, each one with at least the Date and Adj Close columns
+        """
+        self.__directory = directory
+        self.__prices = dict()
+
+    def __read_prices(self, ticker):
+        """
+        Read the price file of the ticker once
+        :param str ticker: ticker to read
+        :return: a DataFrame with all the prices of the ticker, or None if there is no file
+        :rtype: pd.DataFrame
+        """
+        if ticker not in self.__prices:
+            parquet_file_path = os.path.join(self.__directory, f"{ticker}.parquet")
+            csv_file_path = os.path.join(self.__directory, f"{ticker}.csv")
+            if os.path.exists(parquet_file_path):
+                prices = pd.read_parquet(parquet_file_path)
+            elif os.path.exists(csv_file_path):
+                prices = pd.read_csv(csv_file_path)
+            else:
+                prices = None
+            if prices is not None:
+                prices["Date"] = pd.to_datetime(prices["Date"])
+                prices = prices.sort_values("Date").reset_index(drop=True)
+            self.__prices[ticker] = prices
+        return self.__prices[ticker]
+
+    def get_prices(self, ticker, start_date, end_date=None):
+        """
+        Get the prices of the ticker from its file
+        :param str ticker: ticker to get the prices of
+        :param str start_date: start date of the query period in a string format YYYY-MM-DD (or similar)
+        :param str end_date: end date of the query period in a string format YYYY-MM-DD (or similar)
+        :return: a DataFrame with the prices in the requested range
+        :rtype: pd.DataFrame
+        """
+        return self.slice_prices(self.__read_prices(ticker), self.parse_date(start_date), self.parse_date(end_date))
+
+
+class SyntheticDataProvider(DataProvider):
+    """Generate deterministic Geometric Brownian Motion price paths on business days, e.g. for offline benchmarks"""
+
+    def __init__(self, seed=0, drift=0.07, volatility=0.25, origin_date="1990-01-01", initial_price=100.0,
+                 path_cache_size=1024):
+        """
+        Initialize the class with the given inputs
+        :param int seed: seed combined with each ticker to generate its path
+        :param float drift: annualized drift of the paths
+        :param float volatility: annualized volatility of the paths
+        :param str origin_date: first date of every path, so that any requested range slices the same path
+        :param float initial_price: price of every path on the origin date
+        :param int path_cache_size: number of generated paths kept in memory
+        """
+        self.__seed = int(seed)
+        self.__drift = drift
+        self.__volatility = volatility
+        self.__origin_date = self.parse_date(origin_date)
+        self.__initial_price = initial_price
+        self.__calendar_end = max(self.__origin_date, self.parse_date(None))
+        self.__dates = pd.bdate_range(self.__origin_date, self.__calendar_end)
+        self.__path = lru_cache(maxsize=path_cache_size)(self.__generate_path)
+
+    def __random_generator(self, ticker, stream):
+        """
+        Build the random generator of a ticker, independent from the other tickers
+        :param str ticker: ticker of the generator
+        :param int stream: index of the random stream of the ticker
+        :return: a seeded random generator
+        :rtype: np.random.Generator
+        """
+        return np.random.default_rng([self.__seed, zlib.crc32(ticker.encode()), stream])
+
+    def __generate_path(self, ticker):
+        """
+        Generate the prices of the ticker on all the business days of the calendar
+        :param str ticker: ticker to generate the prices of
+        :return: the prices aligned on the calendar
+        :rtype: np.ndarray
+        """
+        daily_drift = (self.__drift - self.__volatility ** 2 / 2) / 252
+        shocks = self.__random_generator(ticker, 0).standard_normal(len(self.__dates))
+        shocks *= self.__volatility / np.sqrt(252)
+        shocks[0] = -daily_drift
+        return self.__initial_price * np.exp(np.cumsum(shocks + daily_drift))
+
+    def __extend_calendar(self, end_date):
+        """
+        Extend the calendar up to the end date, dropping the generated paths as they are shorter
+        :param pd.Timestamp end_date: last date to cover
+        :return: the extended calendar
+        :rtype: None
+        """
+        if end_date <= self.__calendar_end:
+            return
+        self.__calendar_end = end_date
+        self.__dates = pd.bdate_range(self.__origin_date, end_date)
+        self.__path.cache_clear()
+
+    def get_prices(self, ticker, start_date, end_date=None):
+        """
+        Generate the prices of the ticker, slicing its path generated once on the calendar
+        :param str ticker: ticker to generate the prices of
+        :param str start_date: start date of the query period in a string format YYYY-MM-DD (or similar)
+        :param str end_date: end date of the query period in a string format YYYY-MM-DD (or similar)
+        :return: a DataFrame with the Date and Adj Close columns in the requested range
+        :rtype: pd.DataFrame
+        """
+        start_date = self.parse_date(start_date)
+        end_date = self.parse_date(end_date)
+        self.__extend_calendar(end_date)
+        first_row = self.__dates.searchsorted(start_date)
+        last_row = max(first_row, self.__dates.searchsorted(end_date, side="right"))
+        return pd.DataFrame({"Date": self.__dates[first_row:last_row],
+                             "Adj Close": self.__path(ticker)[first_row:last_row]})
+
+    def get_growth_rates(self, tickers, mean=0.05, std=0.03):
+        """
+        Generate deterministic growth rates to run the whole pipeline offline
+        :param list tickers: list of tickers
+        :param float mean: mean of the growth rates
+        :param float std: standard deviation of the growth rates
+        :return: a dictionary with the growth rate of each ticker
+        :rtype: dict
+        """
+        return {ticker: mean + std * self.__random_generator(ticker, 1).standard_normal() for ticker in tickers}
+
+    def get_tickers(self, count):
+        """
+        Generate a list of synthetic tickers
+        :param int count: number of tickers
+        :return: a list of tickers
+        :rtype: list
+        """
+        return [f"SYN{i:05d}" for i in range(count)]
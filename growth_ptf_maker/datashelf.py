@@ -1,14 +1,17 @@
 """Stores static data"""
 
-from .refresh_tickers import GetTickers
+from .universes import get_universe
 
 
 class DataShelf:
     """Static data container"""
 
-    def __init__(self):
-        """Initialize the class with the static data"""
-        self.__ticker_list = sorted(GetTickers().get_tickers())
+    def __init__(self, universe="djia"):
+        """
+        Initialize the class with the static data
+        :param object universe: universe of the tickers, a name in UNIVERSES, a ticker file, a list or a Universe
+        """
+        self.__ticker_list = sorted(get_universe(universe).get_tickers())
 
     def get_ticker_list(self):
         """
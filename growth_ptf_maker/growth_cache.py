@@ -0,0 +1,86 @@
+"""Cache the inferred growth parameters on disk with an as-of date"""
+
+import math
+import os
+import sqlite3
+
+from contextlib import closing
+from datetime import date, timedelta
+
+
+class GrowthCache:
+    """SQLite cache of the inferred growth parameters, keyed by namespace, ticker and as-of date"""
+
+    DEFAULT_NAMESPACE = "ggm"
+
+    def __init__(self, db_path=None, max_age_days=7):
+        """
+        Initialize the class with the given inputs
+        :param str db_path: path of the SQLite database (defaults to ./growth_cache.sqlite)
+        :param int max_age_days: number of days after which a cached growth parameter is stale
+        """
+        self.__db_path = db_path or os.path.join(os.getcwd(), "growth_cache.sqlite")
+        self.__max_age_days = int(max_age_days)
+        self.__create_table()
+
+    def __create_table(self):
+        """
+        Create the table of the growth parameters if it does not exist, the namespace keeping apart the growth
+        parameters of different sources, e.g. the Gordon Growth Model and each walk-forward growth provider
+        :return: the created table
+        :rtype: None
+        """
+        with closing(sqlite3.connect(self.__db_path)) as connection, connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS growth_parameters "
+                               "(namespace TEXT NOT NULL, ticker TEXT NOT NULL, as_of TEXT NOT NULL, g REAL, "
+                               "PRIMARY KEY (namespace, ticker, as_of))")
+
+    def get_fresh_growth_rates(self, tickers, as_of=None, namespace=DEFAULT_NAMESPACE):
+        """
+        Get the latest growth parameters which are not stale as of the given date
+        :param list tickers: list of tickers to look up
+        :param datetime.date as_of: reference date of the look-up (defaults to today)
+        :param str namespace: source of the growth parameters
+        :return: a dictionary with the fresh growth parameters found in the cache
+        :rtype: dict
+        """
+        as_of = as_of or date.today()
+        oldest_fresh_date = (as_of - timedelta(days=self.__max_age_days)).isoformat()
+        wanted_tickers = set(tickers)
+        with closing(sqlite3.connect(self.__db_path)) as connection:
+            rows = connection.execute("SELECT ticker, g, MAX(as_of) FROM growth_parameters "
+                                      "WHERE namespace = ? AND as_of >= ? AND as_of <= ? GROUP BY ticker",
+                                      (namespace, oldest_fresh_date, as_of.isoformat())).fetchall()
+        return {ticker: (float("nan") if g is None else g) for ticker, g, _ in rows if ticker in wanted_tickers}
+
+    def get_growth_rates_as_of(self, tickers, as_of, namespace=DEFAULT_NAMESPACE):
+        """
+        Get the growth parameters saved with exactly the given as-of date, e.g. for point-in-time back-tests
+        :param list tickers: list of tickers to look up
+        :param datetime.date as_of: as-of date of the growth parameters
+        :param str namespace: source of the growth parameters
+        :return: a dictionary with the growth parameters found in the cache
+        :rtype: dict
+        """
+        wanted_tickers = set(tickers)
+        with closing(sqlite3.connect(self.__db_path)) as connection:
+            rows = connection.execute("SELECT ticker, g FROM growth_parameters WHERE namespace = ? AND as_of = ?",
+                                      (namespace, as_of.isoformat())).fetchall()
+        return {ticker: (float("nan") if g is None else g) for ticker, g in rows if ticker in wanted_tickers}
+
+    def save_growth_rates(self, growth_rates, as_of=None, namespace=DEFAULT_NAMESPACE):
+        """
+        Save the growth parameters with the given as-of date
+        :param dict growth_rates: dictionary with the growth parameter of each ticker
+        :param datetime.date as_of: as-of date of the growth parameters (defaults to today)
+        :param str namespace: source of the growth parameters
+        :return: the number of saved growth parameters
+        :rtype: int
+        """
+        as_of = (as_of or date.today()).isoformat()
+        rows = [(namespace, ticker, None if g is None or math.isnan(g) else float(g), as_of)
+                for ticker, g in growth_rates.items()]
+        with closing(sqlite3.connect(self.__db_path)) as connection, connection:
+            connection.executemany("INSERT OR REPLACE INTO growth_parameters (namespace, ticker, g, as_of) "
+                                   "VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
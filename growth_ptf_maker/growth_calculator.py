@@ -1,31 +1,52 @@
 """Calculate the growth for all the US stocks"""
 
-import os
-import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from ggm_calculator import InferParameters as Ip
 
-from .ticker_list import GetTickers
+from .growth_cache import GrowthCache
+from .instrumentation import NULL_METRICS
+from .universes import DiviDataUniverse
+
+
+def _infer_g(ticker):
+    """
+    Infer the growth parameter of a single ticker, isolating any failure
+    :param str ticker: ticker to infer the growth of
+    :return: a tuple with the ticker, the inferred growth (NaN on failure) and the reason of the failure
+    :rtype: tuple
+    """
+    try:
+        return ticker, Ip(ticker).get_inferred_g(), None
+    except Exception as error:
+        return ticker, float("nan"), repr(error)
 
 
 class CalculateG:
     """Calculate g for all the universe of US stocks"""
 
-    def __init__(self, tickers=None):
+    def __init__(self, tickers=None, max_workers=1, chunk_size=1, use_processes=False, growth_cache=None,
+                 metrics=None):
         """
         Initialize the class with the given routines
-        :param list tickers: name of the JSON file to read
+        :param list tickers: list of tickers (the whole DiviData universe if None)
+        :param int max_workers: number of tickers inferred in parallel (1 runs them sequentially)
+        :param int chunk_size: number of tickers sent to a worker at once when using processes
+        :param bool use_processes: use a process pool instead of a thread pool
+        :param GrowthCache growth_cache: cache of the growth parameters (defaults to ./growth_cache.sqlite)
+        :param Metrics metrics: metrics counting the cache hits and misses and the failed tickers (if not None)
         """
         self.__input_tickers = tickers
+        self.__max_workers = max(1, int(max_workers))
+        self.__chunk_size = max(1, int(chunk_size))
+        self.__use_processes = use_processes
+        self.__metrics = metrics or NULL_METRICS
+        self.__failures = dict()
+        self.__growth_cache = growth_cache or GrowthCache()
         if self.__input_tickers is None:
-            self.__pickled_file_path = os.path.join(os.getcwd(), "ticker_data.pickled")
-            if os.path.exists(self.__pickled_file_path):
-                self.__growth_parameters = pickle.load(open(self.__pickled_file_path, "rb"))
-                return
-            self.__tickers = GetTickers().get_downloaded_tickers()
-        else:
-            self.__tickers = self.__format_ticker_list()
-        self.__growth_parameters = self.__calculate_g()
+            self.__input_tickers = DiviDataUniverse().get_tickers()
+        self.__tickers = self.__format_ticker_list()
+        self.__growth_parameters = self.__refresh_growth_parameters()
 
     def __format_ticker_list(self):
         """
@@ -43,17 +64,51 @@ class CalculateG:
             formatted_tickers[key].append(i)
         return formatted_tickers
 
-    def __calculate_g(self):
+    def __refresh_growth_parameters(self):
+        """
+        Recompute only the growth parameters which are stale or missing in the cache and save them back
+        :return: a dictionary with the growth parameters of all the tickers
+        :rtype: dict
+        """
+        tickers = [ticker for letter in self.__tickers for ticker in self.__tickers[letter]]
+        cached_parameters = self.__growth_cache.get_fresh_growth_rates(tickers)
+        missing_tickers = [ticker for ticker in tickers if ticker not in cached_parameters]
+        self.__metrics.increment("growth_cache_hits", len(tickers) - len(missing_tickers))
+        self.__metrics.increment("growth_cache_misses", len(missing_tickers))
+        with self.__metrics.stage("growth_inference"):
+            calculated_parameters = self.__calculate_g(missing_tickers)
+        self.__growth_cache.save_growth_rates({ticker: growth for ticker, growth in calculated_parameters.items()
+                                               if ticker not in self.__failures})
+        cached_parameters.update(calculated_parameters)
+        return {ticker: cached_parameters[ticker] for ticker in tickers}
+
+    def __calculate_g(self, tickers):
         """
         Calculate the growth parameter for all the tickers
+        :param list tickers: list of tickers to calculate the growth parameter of
+        :return: a dictionary with the results
+        :rtype: dict
+        """
+        if self.__max_workers == 1:
+            return self.__collect_results(map(_infer_g, tickers))
+        executor_class = ProcessPoolExecutor if self.__use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=self.__max_workers) as executor:
+            return self.__collect_results(executor.map(_infer_g, tickers, chunksize=self.__chunk_size))
+
+    def __collect_results(self, results):
+        """
+        Gather the growth parameters as they are inferred, recording the failures
+        :param iterable results: iterable of (ticker, growth, reason) tuples
         :return: a dictionary with the results
         :rtype: dict
         """
         growth_parameters = dict()
-        for letter in self.__tickers:
-            for ticker in self.__tickers[letter]:
-                growth_parameters[ticker] = Ip(ticker).get_inferred_g()
-                print(f"{ticker}: {growth_parameters[ticker]}")
+        for ticker, growth, reason in results:
+            growth_parameters[ticker] = growth
+            if reason is not None:
+                self.__failures[ticker] = reason
+                self.__metrics.record_failure(ticker, reason, "growth")
+            print(f"{ticker}: {growth_parameters[ticker]}")
         return growth_parameters
 
     def get_growth_rates(self):
@@ -63,3 +118,11 @@ class CalculateG:
         :rtype: dict
         """
         return self.__growth_parameters
+
+    def get_failures(self):
+        """
+        Return the tickers for which the growth could not be inferred
+        :return: a dictionary with the reason of the failure for each ticker
+        :rtype: dict
+        """
+        return self.__failures
@@ -0,0 +1,147 @@
+"""Collect stage timings, request statistics and counters while building a dashboard"""
+
+import threading
+import time
+
+from collections import Counter
+from contextlib import contextmanager
+
+
+class Metrics:
+    """Structured metrics of a dashboard build, forwarded to optional callbacks as events"""
+
+    def __init__(self, enabled=True, callbacks=None):
+        """
+        Initialize the class with the given inputs
+        :param bool enabled: collect the metrics, when False every method returns immediately
+        :param list callbacks: functions called with (event, payload) for every stage, request and failure recorded
+        """
+        self.__enabled = enabled
+        self.__callbacks = list(callbacks or [])
+        self.__lock = threading.Lock()
+        self.__stage_timings = dict()
+        self.__counters = Counter()
+        self.__requests = list()
+        self.__failed_tickers = dict()
+
+    def __emit(self, event, payload):
+        """
+        Forward an event to the callbacks
+        :param str event: name of the event, one of "stage", "request" and "failure"
+        :param dict payload: data of the event
+        :return: the payload sent to the callbacks
+        :rtype: dict
+        """
+        for callback in self.__callbacks:
+            callback(event, payload)
+        return payload
+
+    def is_enabled(self):
+        """
+        Check whether the metrics are collected
+        :return: True if the metrics are collected
+        :rtype: bool
+        """
+        return self.__enabled
+
+    def add_callback(self, callback):
+        """
+        Add a function called with (event, payload) for every stage, request and failure recorded
+        :param callable callback: function to add
+        :return: the number of callbacks
+        :rtype: int
+        """
+        self.__callbacks.append(callback)
+        return len(self.__callbacks)
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a stage, the time of nested stages is included in the outer ones
+        :param str name: name of the stage
+        :return: a context manager timing the block
+        :rtype: contextmanager
+        """
+        if not self.__enabled:
+            yield
+            return
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            with self.__lock:
+                self.__stage_timings[name] = self.__stage_timings.get(name, 0.0) + elapsed
+            self.__emit("stage", {"name": name, "seconds": elapsed})
+
+    def record_request(self, url, latency, size, status_code):
+        """
+        Record an HTTP request
+        :param str url: URL of the request
+        :param float latency: seconds taken by the request
+        :param int size: bytes received
+        :param int status_code: HTTP status code of the response
+        :return: None
+        :rtype: None
+        """
+        if not self.__enabled:
+            return
+        request = {"url": url, "latency": latency, "bytes": size, "status_code": status_code}
+        with self.__lock:
+            self.__requests.append(request)
+        self.__emit("request", request)
+
+    def increment(self, counter, value=1):
+        """
+        Increment a counter, e.g. the cache hits and misses
+        :param str counter: name of the counter
+        :param int value: increment
+        :return: None
+        :rtype: None
+        """
+        if not self.__enabled:
+            return
+        with self.__lock:
+            self.__counters[counter] += value
+
+    def record_failure(self, ticker, reason, source):
+        """
+        Record a ticker which could not be processed
+        :param str ticker: failed ticker
+        :param str reason: reason of the failure
+        :param str source: step which failed, e.g. "download" or "growth"
+        :return: None
+        :rtype: None
+        """
+        if not self.__enabled:
+            return
+        failure = {"ticker": ticker, "reason": reason, "source": source}
+        with self.__lock:
+            self.__failed_tickers.setdefault(source, dict())[ticker] = reason
+        self.__emit("failure", failure)
+
+    def get_results(self):
+        """
+        Get a snapshot of the collected metrics
+        :return: a dictionary with the stage timings, the counters, the request statistics and the failed tickers
+        :rtype: dict
+        """
+        with self.__lock:
+            requests = list(self.__requests)
+            results = {
+                "stages": dict(self.__stage_timings),
+                "counters": dict(self.__counters),
+                "failed_tickers": {source: dict(tickers) for source, tickers in self.__failed_tickers.items()}
+            }
+        latencies = [request["latency"] for request in requests]
+        results["requests"] = {
+            "count": len(requests),
+            "bytes": sum(request["bytes"] for request in requests),
+            "total_latency": sum(latencies),
+            "max_latency": max(latencies) if latencies else 0.0,
+            "details": requests
+        }
+        return results
+
+
+NULL_METRICS = Metrics(enabled=False)
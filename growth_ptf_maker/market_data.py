@@ -0,0 +1,103 @@
+"""Share the market data downloaded once across all the components of a dashboard build"""
+
+from .instrumentation import NULL_METRICS
+from .price_store import PriceStore
+
+
+class MarketData:
+    """Session-scoped provider fetching the union of the requested tickers and dates exactly once"""
+
+    def __init__(self, start_date, end_date=None, data_provider=None, metrics=None):
+        """
+        Initialize the class with the given inputs
+        :param str start_date: start date of the session in a string format YYYY-MM-DD (or similar)
+        :param str end_date: end date of the session in a string format YYYY-MM-DD (or similar), None meaning today
+        :param DataProvider data_provider: backend of the market data (defaults to the Yahoo! Finance PriceStore)
+        :param Metrics metrics: metrics counting the session hits and misses (not recorded if None)
+        """
+        self.__metrics = metrics or NULL_METRICS
+        self.__data_provider = data_provider or PriceStore(metrics=metrics)
+        self.__start_date = self.__data_provider.parse_date(start_date)
+        self.__end_date = self.__data_provider.parse_date(end_date)
+        self.__histories = dict()
+        self.__failures = dict()
+
+    def __fetch(self, tickers):
+        """
+        Fetch the full session range of the tickers, keeping an empty history for the tickers which failed
+        :param list tickers: list of tickers to fetch
+        :return: the fetched histories saved in the session
+        :rtype: None
+        """
+        histories = self.__data_provider.get_many_prices(tickers, self.__start_date, self.__end_date)
+        provider_failures = self.__data_provider.get_failures()
+        for ticker in tickers:
+            if ticker not in histories:
+                self.__failures[ticker] = provider_failures.get(ticker, "no data")
+                histories[ticker] = self.__data_provider.slice_prices(None, self.__start_date, self.__end_date)
+            else:
+                self.__failures.pop(ticker, None)
+        self.__histories.update(histories)
+
+    def __extend_range(self, start_date, end_date):
+        """
+        Extend the session range to cover the requested dates, dropping the histories which do not cover it
+        :param pd.Timestamp start_date: requested start date
+        :param pd.Timestamp end_date: requested end date
+        :return: the extended session range
+        :rtype: None
+        """
+        if start_date >= self.__start_date and end_date <= self.__end_date:
+            return
+        self.__start_date = min(self.__start_date, start_date)
+        self.__end_date = max(self.__end_date, end_date)
+        self.__histories = dict()
+
+    def load(self, tickers):
+        """
+        Fetch in parallel the session range for all the given tickers not loaded yet
+        :param list tickers: list of tickers to load
+        :return: the loaded tickers
+        :rtype: list
+        """
+        missing_tickers = [ticker for ticker in dict.fromkeys(tickers) if ticker not in self.__histories]
+        self.__metrics.increment("market_data_misses", len(missing_tickers))
+        if missing_tickers:
+            self.__fetch(missing_tickers)
+        return list(self.__histories.keys())
+
+    def get_prices(self, ticker, start_date=None, end_date=None):
+        """
+        Get a view of the session data for the ticker in the requested range
+        :param str ticker: ticker to get the prices of
+        :param str start_date: start date of the view, None meaning the session start date
+        :param str end_date: end date of the view, None meaning today
+        :return: a DataFrame with the prices in the requested range, empty if the ticker could not be fetched
+        :rtype: pd.DataFrame
+        """
+        start_date = self.__data_provider.parse_date(start_date) if start_date is not None else self.__start_date
+        end_date = self.__data_provider.parse_date(end_date)
+        self.__extend_range(start_date, end_date)
+        history = self.__histories.get(ticker)
+        self.__metrics.increment("market_data_hits" if history is not None else "market_data_misses")
+        if history is None:
+            self.__fetch([ticker])
+            history = self.__histories[ticker]
+        in_range = (history["Date"] >= start_date) & (history["Date"] <= end_date)
+        return history.loc[in_range].reset_index(drop=True)
+
+    def get_failures(self):
+        """
+        Get the tickers which could not be fetched in the session
+        :return: a dictionary with the reason of the failure for each ticker
+        :rtype: dict
+        """
+        return self.__failures
+
+    def get_data_provider(self):
+        """
+        Get the backend of the session
+        :return: the market data backend
+        :rtype: DataProvider
+        """
+        return self.__data_provider
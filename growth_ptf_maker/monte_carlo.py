@@ -0,0 +1,167 @@
+"""Simulate the portfolio returns with Monte Carlo to estimate VaR and ES at many horizons"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("normal", "bootstrap")
+
+
+def _simulate_chunk(method, seed_sequence, paths, horizons, parameters):
+    """
+    Simulate a chunk of daily portfolio return paths and compound them up to each horizon
+    :param str method: "normal" to draw the daily returns from a Gaussian, "bootstrap" to resample historical days
+    :param np.random.SeedSequence seed_sequence: seed of the chunk, independent from the other chunks
+    :param int paths: number of paths of the chunk
+    :param np.ndarray horizons: sorted horizons in days
+    :param dict parameters: mean and std of the daily returns for "normal", historical daily returns for "bootstrap"
+    :return: the compounded returns with a row for each path and a column for each horizon
+    :rtype: np.ndarray
+    """
+    random_generator = np.random.default_rng(seed_sequence)
+    days = int(horizons[-1])
+    if method == "normal":
+        daily_returns = random_generator.standard_normal((paths, days))
+        daily_returns *= parameters["std"]
+        daily_returns += parameters["mean"]
+    else:
+        history = parameters["history"]
+        daily_returns = history[random_generator.integers(0, len(history), (paths, days))]
+    daily_returns += 1
+    np.cumprod(daily_returns, axis=1, out=daily_returns)
+    return daily_returns[:, horizons - 1] - 1
+
+
+class MonteCarloRiskMetrics:
+    """Estimate VaR and ES of the back-tested portfolio at many horizons by simulating its daily returns"""
+
+    def __init__(self, back_test_data, method="normal", paths=100000, horizons=(1, 10, 250),
+                 confidence_levels=(95, 97.5, 99), chunk_size=10000, max_workers=1, seed=0):
+        """
+        Initialize the class with the given parameters
+        :param BackTest back_test_data: back-test with the weighted returns of the components
+        :param str method: "normal" draws the daily returns from a Gaussian with the mean and the covariance of the
+        component returns projected on the weights, "bootstrap" resamples the historical days of the portfolio
+        :param int paths: number of simulated paths
+        :param tuple horizons: horizons in days of the risk measures
+        :param tuple confidence_levels: confidence levels in percentage
+        :param int chunk_size: number of paths simulated at once, bounding the memory to chunk_size x max(horizons)
+        :param int max_workers: number of processes simulating the chunks (1 runs them sequentially)
+        :param int seed: seed of the simulation, the results do not depend on the number of workers
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown method {method}, use one of {', '.join(METHODS)}")
+        self.__back_tested_data = back_test_data.get_back_test_results()
+        self.__method = method
+        self.__paths = int(paths)
+        self.__horizons = np.array(sorted(set(int(i) for i in horizons)), dtype=int)
+        self.__confidence_levels = sorted(set(confidence_levels))
+        self.__chunk_size = max(1, min(int(chunk_size), self.__paths))
+        self.__max_workers = max(1, int(max_workers))
+        self.__seed = seed
+        self.__parameters = self.__estimate_parameters()
+        self.__simulated_returns, self.__chunk_results = self.__simulate()
+        self.__results = self.__summarize()
+
+    def __estimate_parameters(self):
+        """
+        Estimate the parameters of the simulation from the back-test, skipping the days without any component return,
+        like the first one
+        :return: a dictionary with the mean and the std of the daily returns, or the historical daily returns
+        :rtype: dict
+        """
+        component_columns = self.__back_tested_data.columns.drop(["Portfolio", "Portfolio_Dollars"])
+        weighted_returns = self.__back_tested_data[component_columns].to_numpy(dtype=float) - 1
+        observed_days = ~np.isnan(weighted_returns).all(axis=1)
+        if self.__method == "bootstrap":
+            history = self.__back_tested_data["Portfolio"].to_numpy(dtype=float)[observed_days] - 1
+            return {"history": history[~np.isnan(history)]}
+        weighted_returns = weighted_returns[observed_days]
+        portfolio_returns = np.nansum(weighted_returns, axis=1)
+        return {"mean": portfolio_returns.mean(), "std": portfolio_returns.std(ddof=1)}
+
+    def __chunks(self):
+        """
+        Split the paths in chunks, each one with its own spawned seed
+        :return: a list of (method, seed sequence, paths, horizons, parameters) tuples
+        :rtype: list
+        """
+        chunk_paths = [self.__chunk_size] * (self.__paths // self.__chunk_size)
+        if self.__paths % self.__chunk_size:
+            chunk_paths.append(self.__paths % self.__chunk_size)
+        seed_sequences = np.random.SeedSequence(self.__seed).spawn(len(chunk_paths))
+        return [(self.__method, seed_sequence, paths, self.__horizons, self.__parameters)
+                for seed_sequence, paths in zip(seed_sequences, chunk_paths)]
+
+    def __measure(self, simulated_returns):
+        """
+        Calculate VaR and ES as positive losses for each horizon and confidence level
+        :param np.ndarray simulated_returns: compounded returns with a column for each horizon
+        :return: a DataFrame indexed by horizon and confidence level with the var and es columns
+        :rtype: pd.DataFrame
+        """
+        records = list()
+        for position, horizon in enumerate(self.__horizons):
+            sorted_returns = np.sort(simulated_returns[:, position])
+            for level in self.__confidence_levels:
+                tail_size = max(1, int(np.floor(len(sorted_returns) * (1 - level / 100))))
+                records.append({"horizon": horizon, "confidence": level,
+                                "var": -np.quantile(sorted_returns, 1 - level / 100),
+                                "es": -sorted_returns[:tail_size].mean()})
+        return pd.DataFrame(records).set_index(["horizon", "confidence"])
+
+    def __simulate(self):
+        """
+        Simulate the chunks of paths, in parallel processes if requested
+        :return: a tuple with the simulated returns of all the paths and the risk measures of each chunk
+        :rtype: tuple
+        """
+        chunks = self.__chunks()
+        if self.__max_workers == 1 or len(chunks) == 1:
+            chunk_returns = [_simulate_chunk(*chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.__max_workers) as executor:
+                chunk_returns = list(executor.map(_simulate_chunk, *zip(*chunks)))
+        chunk_results = pd.concat([self.__measure(i) for i in chunk_returns], keys=range(len(chunk_returns)),
+                                  names=["chunk"])
+        return np.concatenate(chunk_returns), chunk_results
+
+    def __summarize(self):
+        """
+        Calculate the risk measures on all the paths along with their standard errors across the chunks
+        :return: a DataFrame indexed by horizon and confidence level with the var, es, var_se and es_se columns
+        :rtype: pd.DataFrame
+        """
+        results = self.__measure(self.__simulated_returns)
+        chunk_count = self.__chunk_results.index.get_level_values("chunk").nunique()
+        if chunk_count > 1:
+            standard_errors = self.__chunk_results.groupby(level=["horizon", "confidence"]).std() / np.sqrt(chunk_count)
+        else:
+            standard_errors = results * np.nan
+        return results.join(standard_errors.add_suffix("_se"))
+
+    def get_results(self):
+        """
+        Get VaR and ES estimated on all the paths
+        :return: a DataFrame indexed by horizon and confidence level with the var and es columns and their standard
+        errors across the chunks
+        :rtype: pd.DataFrame
+        """
+        return self.__results
+
+    def get_chunk_results(self):
+        """
+        Get the distribution of VaR and ES across the independent chunks of paths
+        :return: a DataFrame indexed by chunk, horizon and confidence level with the var and es columns
+        :rtype: pd.DataFrame
+        """
+        return self.__chunk_results
+
+    def get_simulated_returns(self):
+        """
+        Get the compounded returns of all the paths
+        :return: a DataFrame with a row for each path and a column for each horizon
+        :rtype: pd.DataFrame
+        """
+        return pd.DataFrame(self.__simulated_returns, columns=pd.Index(self.__horizons, name="horizon"))
@@ -0,0 +1,187 @@
+"""Run many Back-Test variants over the same price matrix and growth rates across CPU cores"""
+
+import traceback
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .returns_engine import ReturnsEngine
+from .risk_metrics import RiskEngine
+from .weighting_engine import WeightingEngine
+
+_SHARED_DATA = dict()
+
+
+def _cdf_weights(growth_rates):
+    """
+    Map the growth rates to weights with the default standardization, norm.cdf(z) - 0.5
+    :param pd.Series growth_rates: growth rates indexed by ticker
+    :return: the weights indexed by ticker
+    :rtype: pd.Series
+    """
+    return WeightingEngine().get_weights(growth_rates)
+
+
+def _winsorized_weights(growth_rates):
+    """
+    Map the growth rates to weights with the standardization of the growth rates clipped at their 5% and 95% quantiles
+    :param pd.Series growth_rates: growth rates indexed by ticker
+    :return: the weights indexed by ticker
+    :rtype: pd.Series
+    """
+    return WeightingEngine("winsorized").get_weights(growth_rates)
+
+
+def _rank_weights(growth_rates):
+    """
+    Map the growth rates to weights with their percentile ranks minus 0.5
+    :param pd.Series growth_rates: growth rates indexed by ticker
+    :return: the weights indexed by ticker
+    :rtype: pd.Series
+    """
+    return WeightingEngine("rank").get_weights(growth_rates)
+
+
+TRANSFORMS = {"cdf": _cdf_weights, "zscore": _cdf_weights, "winsorized": _winsorized_weights, "rank": _rank_weights}
+
+
+def _attach_shared_data(shared_memory_name, shape, dtype, dates, tickers, growth_rates, confidence_levels):
+    """
+    Attach a worker to the shared price matrix once, keeping a read-only view of it
+    :param str shared_memory_name: name of the shared memory block holding the prices
+    :param tuple shape: shape of the price matrix
+    :param str dtype: data type of the price matrix
+    :param np.ndarray dates: dates of the rows of the price matrix
+    :param list tickers: tickers of the columns of the price matrix
+    :param np.ndarray growth_rates: growth rates aligned to the columns of the price matrix
+    :param list confidence_levels: confidence levels of the risk measures
+    :return: the attached data saved in the worker
+    :rtype: None
+    """
+    shared_block = shared_memory.SharedMemory(name=shared_memory_name)
+    prices = np.ndarray(shape, dtype=dtype, buffer=shared_block.buf)
+    prices.flags.writeable = False
+    _SHARED_DATA.update({"block": shared_block, "prices": prices, "dates": dates, "tickers": tickers,
+                         "growth_rates": growth_rates, "confidence_levels": confidence_levels})
+
+
+def _release_frames(error):
+    """
+    Clear the local variables of the frames of an error and of the errors it was raised from, so that their views of
+    the shared memory are released before the block is closed
+    :param BaseException error: raised error
+    :return: None
+    :rtype: None
+    """
+    while error is not None:
+        traceback.clear_frames(error.__traceback__)
+        error = error.__cause__ or error.__context__
+
+
+def _close_block(shared_block):
+    """
+    Close a shared memory block, leaving it mapped if a view of it is still alive
+    :param shared_memory.SharedMemory shared_block: block to close
+    :return: None
+    :rtype: None
+    """
+    try:
+        shared_block.close()
+    except BufferError:
+        pass
+
+
+def _run_variant(variant):
+    """
+    Back-Test a single variant on the shared data
+    :param dict variant: variant with the optional keys name, years, transform and universe
+    :return: a dictionary with the returns and the risk measures of the variant
+    :rtype: dict
+    """
+    dates = _SHARED_DATA["dates"]
+    tickers = _SHARED_DATA["tickers"]
+    first_row = 0
+    if variant.get("years") is not None:
+        start_date = dates[-1] - np.timedelta64(int(round(variant["years"] * 365)), "D")
+        first_row = int(np.searchsorted(dates, start_date))
+    universe = set(variant.get("universe") or tickers)
+    columns = np.array([position for position, ticker in enumerate(tickers) if ticker in universe], dtype=int)
+    transform = variant.get("transform", "cdf")
+    transform_name = transform if isinstance(transform, str) else transform.__name__
+    transform = TRANSFORMS[transform] if isinstance(transform, str) else transform
+    growth_rates = pd.Series(_SHARED_DATA["growth_rates"][columns], index=[tickers[i] for i in columns])
+    weights = transform(growth_rates).reindex(growth_rates.index).fillna(0).to_numpy(dtype=float)
+    prices = _SHARED_DATA["prices"][first_row:, columns]
+    _, portfolio, portfolio_dollars = ReturnsEngine.calculate(prices, weights)
+    risk_table = RiskEngine(portfolio, _SHARED_DATA["confidence_levels"]).get_results()
+    results = {
+        "name": variant.get("name"),
+        "years": variant.get("years"),
+        "transform": transform_name,
+        "components": len(columns),
+        "start_date": dates[first_row] if first_row < len(dates) else None,
+        "total_return": portfolio_dollars[-1] / 100 - 1 if len(portfolio_dollars) else np.nan,
+        "min": np.nanmin(portfolio) - 1 if len(portfolio) else np.nan,
+        "min_max_range": (np.nanmax(portfolio) - np.nanmin(portfolio)) - 1 if len(portfolio) else np.nan
+    }
+    for level, row in risk_table.iterrows():
+        suffix = f"{level:g}".replace(".", "")
+        results.update({f"var{suffix}": row["var"], f"es{suffix}": row["es"], f"hvar{suffix}": row["hvar"]})
+    return results
+
+
+class ParameterSweep:
+    """Fan out Back-Test variants across processes sharing one copy of the price matrix"""
+
+    def __init__(self, prices, growth_rates, confidence_levels=(95, 97.5, 99), max_workers=None):
+        """
+        Initialize the class with the given inputs
+        :param pd.DataFrame prices: matrix of prices with the dates as index and the tickers as columns
+        :param dict growth_rates: dictionary with the growth rate of each ticker
+        :param list confidence_levels: confidence levels of the risk measures, in percentage
+        :param int max_workers: number of worker processes (1 runs the variants in the current process)
+        """
+        self.__prices = prices.sort_index()
+        self.__growth_rates = pd.Series(growth_rates, dtype=float).reindex(self.__prices.columns).to_numpy()
+        self.__confidence_levels = list(confidence_levels)
+        self.__max_workers = max_workers
+
+    def run(self, variants):
+        """
+        Run all the variants, copying the prices once in shared memory
+        :param list variants: list of dictionaries with the optional keys name, years (back-test window), transform
+            (a key of TRANSFORMS or a picklable function mapping a Series of growth rates to a Series of weights)
+            and universe (list of tickers)
+        :return: a tidy DataFrame with a row of returns and risk measures for each variant
+        :rtype: pd.DataFrame
+        """
+        prices = np.ascontiguousarray(self.__prices.to_numpy(dtype=float))
+        shared_block = shared_memory.SharedMemory(create=True, size=max(prices.nbytes, 1))
+        try:
+            np.ndarray(prices.shape, dtype=prices.dtype, buffer=shared_block.buf)[:] = prices
+            shared_arguments = (shared_block.name, prices.shape, prices.dtype.str,
+                                self.__prices.index.to_numpy(dtype="datetime64[ns]"),
+                                self.__prices.columns.tolist(), self.__growth_rates, self.__confidence_levels)
+            del prices
+            if self.__max_workers == 1:
+                _attach_shared_data(*shared_arguments)
+                try:
+                    results = [_run_variant(variant) for variant in variants]
+                except BaseException as error:
+                    _release_frames(error)
+                    raise
+                finally:
+                    del _SHARED_DATA["prices"]
+                    _close_block(_SHARED_DATA.pop("block"))
+                    _SHARED_DATA.clear()
+            else:
+                with ProcessPoolExecutor(max_workers=self.__max_workers, initializer=_attach_shared_data,
+                                         initargs=shared_arguments) as executor:
+                    results = list(executor.map(_run_variant, variants))
+        finally:
+            _close_block(shared_block)
+            shared_block.unlink()
+        return pd.DataFrame(results)
@@ -1,44 +1,41 @@
 """Module to compute the performance of the portfolio"""
 
-from functools import reduce
-
-import pandas as pd
-
-from .yahoo_data_downloader import YahooFinanceDownloader
+from .market_data import MarketData
+from .price_panel import PricePanel
+from .results_store import ResultsStore
+from .returns_engine import ReturnsEngine
 
 
 class Performance:
-    """Calculate the performance of the portfolio from a given date given weights saved in dir"""
+    """Calculate the performance of the portfolio from a given date given the saved weights"""
 
-    def __init__(self, start_date, end_date):
+    def __init__(self, start_date, end_date, market_data=None, join="inner", weights=None):
         """
         Initialize the class with the given inputs
         :param str start_date: start date of the performance
         :param str end_date: end date of the performance
-        """
-        self.__weights = pd.read_csv("weights.csv", index_col=0)
-        self.__historical_data = [{i: YahooFinanceDownloader(i, start_date, end_date)}
-                                  for i in self.__weights.index.tolist()]
+        :param MarketData market_data: market data shared by the session (a new session is created if None)
+        :param str join: alignment policy of the dates of the components, one of "inner", "outer" or "ffill"
+        :param pd.DataFrame weights: DataFrame with the weights of the components (the latest saved weights if None)
+        """
+        self.__weights = weights if weights is not None else ResultsStore().get_frame(ResultsStore.WEIGHTS)
+        self.__join = join
+        self.__market_data = market_data or MarketData(start_date, end_date)
+        self.__market_data.load(self.__weights.index.tolist())
+        self.__historical_data = {i: self.__market_data.get_prices(i, start_date, end_date)
+                                  for i in self.__weights.index}
         self.__formatted_data = self.__format_and_reshape_historical_data()
         self.__returns = self.__calculate_portfolio_returns()
 
     def __format_and_reshape_historical_data(self):
         """
         Format and reshape the downloaded historical data
-        :return: a Pandas DataFrame with the data
+        :return: a Pandas DataFrame with the prices of the components in the weights
         :rtype: pd.DataFrame
         """
-        formatted_data = list()
-        for series in self.__historical_data:
-            for ticker in series:
-                if ticker in self.__weights.index.tolist():
-                    series_df = series[ticker].get_parsed_results()
-                    temp_df = series_df[["Date", "Adj Close"]]
-                    temp_df.columns = ["Date", ticker]
-                    formatted_data.append(temp_df)
-        merged_series = reduce(lambda x, y: pd.merge(x, y, on="Date"), formatted_data)
-        merged_series.set_index("Date", inplace=True)
-        return merged_series
+        price_panel = PricePanel(self.__historical_data, self.__weights.index, self.__join)
+        self.__dropped_tickers = price_panel.get_dropped_tickers()
+        return price_panel.get_panel()
 
     def __calculate_portfolio_returns(self):
         """
@@ -46,12 +43,7 @@ class Performance:
         :return: a DataFrame with the portfolio returns
         :rtype: pd.DataFrame
         """
-        components_return = self.__formatted_data.pct_change()
-        for ticker in components_return.columns:
-            components_return[ticker] = (components_return[ticker] * self.__weights["weights"][ticker]) + 1
-        components_return["Portfolio"] = components_return.product(axis=1)
-        components_return["Portfolio_Dollars"] = components_return["Portfolio"].cumprod() * 100
-        return components_return
+        return ReturnsEngine(self.__formatted_data, self.__weights["weights"]).get_results()
 
     def portfolio_returns(self):
         """
@@ -60,3 +52,11 @@ class Performance:
         :rtype: pd.DataFrame
         """
         return self.__returns
+
+    def get_dropped_tickers(self):
+        """
+        Return the tickers left out of the price matrix
+        :return: a dictionary with the reason for each dropped ticker
+        :rtype: dict
+        """
+        return self.__dropped_tickers
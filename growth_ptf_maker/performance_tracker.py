@@ -0,0 +1,173 @@
+"""Track the performance of the portfolio incrementally, day by day and intraday"""
+
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from .price_panel import PricePanel
+from .price_store import PriceStore
+from .results_store import ResultsStore
+from .returns_engine import ReturnsEngine
+
+
+class PerformanceTracker:
+    """Extend the performance of the portfolio with the new trading days only, persisting the last state on disk"""
+
+    def __init__(self, start_date, weights=None, data_provider=None, state_path=None, join="inner"):
+        """
+        Initialize the class with the given inputs, loading the saved state or building it from the start date
+        :param str start_date: start date of the performance
+        :param pd.DataFrame weights: DataFrame with the weights of the components (the latest saved weights if None)
+        :param DataProvider data_provider: backend of the market data (defaults to the Yahoo! Finance PriceStore)
+        :param str state_path: path of the saved state (defaults to ./performance_tracker.pickled)
+        :param str join: alignment policy of the dates of the components, one of "inner", "outer" or "ffill"
+        """
+        weights = weights if weights is not None else ResultsStore().get_frame(ResultsStore.WEIGHTS)
+        self.__weights = weights["weights"].astype(float)
+        self.__data_provider = data_provider or PriceStore()
+        self.__state_path = state_path or os.path.join(os.getcwd(), "performance_tracker.pickled")
+        self.__join = join
+        self.__start_date = self.__data_provider.parse_date(start_date)
+        self.__state = self.__load_state()
+        if self.__state is None:
+            self.__state = self.__build_state()
+            self.__save_state()
+
+    def __load_state(self):
+        """
+        Load the saved state if it tracks the same start date and weights
+        :return: a dictionary with the state, or None if it is missing or tracks another portfolio
+        :rtype: dict
+        """
+        if not os.path.exists(self.__state_path):
+            return None
+        with open(self.__state_path, "rb") as state_file:
+            state = pickle.load(state_file)
+        if state["start_date"] != self.__start_date or not state["weights"].equals(self.__weights):
+            return None
+        return state
+
+    def __save_state(self):
+        """
+        Save the state of the tracker
+        :return: a saved pickled file
+        :rtype: None
+        """
+        with open(self.__state_path, "wb") as state_file:
+            pickle.dump(self.__state, state_file)
+
+    def __fetch_panel(self, start_date, end_date):
+        """
+        Fetch the prices of the components in the given range, up to the last closed session: the bar of today may be
+        a partial intraday print, which the stream prices instead
+        :param pd.Timestamp start_date: start date of the range
+        :param str end_date: end date of the range, None meaning today
+        :return: a DataFrame with the dates as index and the components as columns, in the order of the weights
+        :rtype: pd.DataFrame
+        """
+        tickers = self.__weights.index.tolist()
+        last_closed_date = self.__data_provider.parse_date(None) - pd.Timedelta(days=1)
+        end_date = min(self.__data_provider.parse_date(end_date), last_closed_date)
+        historical_data = self.__data_provider.get_many_prices(tickers, start_date, end_date)
+        return PricePanel(historical_data, tickers, self.__join).get_panel().reindex(columns=tickers)
+
+    def __build_state(self):
+        """
+        Build the state from the start date
+        :return: a dictionary with the start date, the weights, the history, the last prices and the last level
+        :rtype: dict
+        """
+        panel = self.__fetch_panel(self.__start_date, None)
+        _, portfolio, portfolio_dollars = ReturnsEngine.calculate(panel.to_numpy(dtype=float),
+                                                                  self.__weights.to_numpy())
+        history = pd.DataFrame({"Portfolio": portfolio, "Portfolio_Dollars": portfolio_dollars}, index=panel.index)
+        return {
+            "start_date": self.__start_date,
+            "weights": self.__weights,
+            "history": history,
+            "last_prices": panel.ffill().iloc[-1] if len(panel) else pd.Series(np.nan, index=self.__weights.index),
+            "last_level": portfolio_dollars[-1] if len(portfolio_dollars) else 100.0
+        }
+
+    def update(self, end_date=None):
+        """
+        Fetch only the closed trading days after the last tracked one and extend the performance with them
+        :param str end_date: last date to fetch in a string format YYYY-MM-DD (or similar), None meaning yesterday
+        :return: a DataFrame with the Portfolio and Portfolio_Dollars columns of the new days
+        :rtype: pd.DataFrame
+        """
+        history = self.__state["history"]
+        last_date = history.index[-1] if len(history) else self.__start_date
+        panel = self.__fetch_panel(last_date, end_date)
+        panel = panel.loc[panel.index > last_date] if len(history) else panel
+        if panel.empty:
+            return history.iloc[:0]
+        prices = np.vstack([self.__state["last_prices"].to_numpy(dtype=float), panel.to_numpy(dtype=float)])
+        _, portfolio, portfolio_dollars = ReturnsEngine.calculate(prices, self.__weights.to_numpy())
+        new_days = pd.DataFrame({"Portfolio": portfolio[1:],
+                                 "Portfolio_Dollars": self.__state["last_level"] * portfolio_dollars[1:] / 100},
+                                index=panel.index)
+        self.__state["history"] = pd.concat([history, new_days]) if len(history) else new_days
+        self.__state["last_prices"] = panel.ffill().iloc[-1].fillna(self.__state["last_prices"])
+        self.__state["last_level"] = new_days["Portfolio_Dollars"].iloc[-1]
+        self.__save_state()
+        return new_days
+
+    def __price_intraday(self, factors, timestamp, prices):
+        """
+        Value the portfolio on an intraday quote against the last close
+        :param np.ndarray factors: one plus the weighted return of each component since the last close, updated in place
+        :param object timestamp: time of the quote
+        :param dict prices: latest price of the quoted components
+        :return: a dictionary with the timestamp, the Portfolio return (plus one) and the Portfolio_Dollars value
+        :rtype: dict
+        """
+        quoted = pd.Series(prices, dtype=float).reindex(self.__weights.index)
+        positions = np.flatnonzero(quoted.notna().to_numpy())
+        last_prices = self.__state["last_prices"].to_numpy(dtype=float)
+        weights = self.__weights.to_numpy()
+        factors[positions] = (quoted.to_numpy()[positions] / last_prices[positions] - 1) * weights[positions] + 1
+        portfolio = np.nanprod(factors)
+        return {"timestamp": timestamp, "Portfolio": portfolio,
+                "Portfolio_Dollars": self.__state["last_level"] * portfolio}
+
+    def stream(self, quotes):
+        """
+        Emit the running value of the portfolio for each intraday quote, keeping the latest price of each component
+        :param iterable quotes: iterable of (timestamp, prices) tuples, prices being a dictionary ticker -> price
+        :return: a generator of dictionaries with the timestamp, the Portfolio and the Portfolio_Dollars values
+        :rtype: generator
+        """
+        factors = np.ones(len(self.__weights))
+        for timestamp, prices in quotes:
+            yield self.__price_intraday(factors, timestamp, prices)
+
+    async def astream(self, quotes):
+        """
+        Emit the running value of the portfolio for each intraday quote of an asynchronous stream
+        :param async iterable quotes: asynchronous iterable of (timestamp, prices) tuples
+        :return: an asynchronous generator of dictionaries with the timestamp, the Portfolio and the Portfolio_Dollars
+        values
+        :rtype: async generator
+        """
+        factors = np.ones(len(self.__weights))
+        async for timestamp, prices in quotes:
+            yield self.__price_intraday(factors, timestamp, prices)
+
+    def portfolio_returns(self):
+        """
+        Return the tracked portfolio returns
+        :return: a DataFrame with the Portfolio and Portfolio_Dollars columns
+        :rtype: pd.DataFrame
+        """
+        return self.__state["history"]
+
+    def get_last_level(self):
+        """
+        Get the value of the portfolio at the last tracked close
+        :return: the last Portfolio_Dollars value
+        :rtype: float
+        """
+        return self.__state["last_level"]
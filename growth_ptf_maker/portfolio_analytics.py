@@ -1,43 +1,105 @@
 """Calculate the portfolio analytics"""
 
+import numpy as np
 import pandas as pd
 
 from datetime import datetime, timedelta
 
 from .backtest import BackTest
-from .yahoo_data_downloader import YahooFinanceDownloader
+from .market_data import MarketData
+from .price_panel import PricePanel
 
 
 class PortfolioAnalytics:
     """Calculate the Portfolio Analytics"""
 
-    def __init__(self, growth_rates, back_test_results, back_test_years_window):
+    DEFAULT_BENCHMARKS = ("DJIA",)
+
+    def __init__(self, growth_rates, back_test_results, back_test_years_window, market_data=None,
+                 benchmarks=DEFAULT_BENCHMARKS, tracking_error_window=63):
         """
         Initialize the class with the inputs
         :param dict growth_rates: dictionary with the inferred growth rates
         :param BackTest back_test_results: class containing the back-test results
         :param int back_test_years_window: years to use to back-test the constructed portfolio
+        :param MarketData market_data: market data shared by the session (a new session is created if None)
+        :param tuple benchmarks: tickers of the benchmarks to compare the portfolio with
+        :param int tracking_error_window: number of days of the rolling tracking error
         """
         self.growth_rates = growth_rates
         self.__back_test_class = back_test_results
         self.__back_test_results = self.__back_test_class.get_back_test_results()
         self.__start_date = str(datetime.today() - timedelta(days=(back_test_years_window * 365)))
-        self.__djia_performance = self.__format_benchmark_data()
+        self.__market_data = market_data or MarketData(self.__start_date)
+        self.__benchmarks = list(dict.fromkeys(benchmarks))
+        self.__tracking_error_window = int(tracking_error_window)
+        self.__benchmark_performance = self.__format_benchmark_data()
+        self.__excess_returns, self.__excess_return_dollars, self.__tracking_error = self.__compare_with_benchmarks()
+        self.__chart_data = self.__build_chart_data()
         self.results = self.__build_results()
 
     def __format_benchmark_data(self):
         """
-        Format the DataFrame to match the same format as the Portfolio data
-        :return: a Pandas DataFrame with the same format as the Portfolio
+        Load the benchmarks and align them on the dates of the portfolio in a single join
+        :return: a Pandas DataFrame with the dollar performance of each benchmark, based to 100 on the first date (empty
+        if the back-test has no dates)
         :rtype: pd.DataFrame
         """
-        self.__djia_data = YahooFinanceDownloader("DJIA", self.__start_date).get_parsed_results()
-        self.__djia_data = self.__djia_data[["Date", "Adj Close"]]
-        self.__djia_data["Pct Change"] = self.__djia_data["Adj Close"].pct_change()
-        self.__djia_data.fillna(value=0, inplace=True)
-        self.__djia_data["Dollar_Performance"] = (self.__djia_data["Pct Change"] + 1).cumprod() * 100
-        self.__djia_data.set_index("Date", inplace=True)
-        return self.__djia_data
+        self.__market_data.load(self.__benchmarks)
+        historical_data = {i: self.__market_data.get_prices(i, self.__start_date) for i in self.__benchmarks}
+        price_panel = PricePanel(historical_data, self.__benchmarks, join="outer")
+        self.__dropped_benchmarks = price_panel.get_dropped_tickers()
+        benchmark_prices = price_panel.get_panel().reindex(self.__back_test_results.index, method="ffill")
+        if benchmark_prices.empty:
+            return benchmark_prices
+        return benchmark_prices.div(benchmark_prices.bfill().iloc[0]) * 100
+
+    def __compare_with_benchmarks(self):
+        """
+        Compare the daily returns and the dollar performance of the portfolio with each benchmark
+        :return: a tuple with the daily excess returns, the excess dollar performance and the annualized rolling
+        tracking error, each a Pandas DataFrame with a column for each benchmark
+        :rtype: tuple
+        """
+        portfolio_returns = self.__back_test_results["Portfolio"] - 1
+        benchmark_returns = self.__benchmark_performance.pct_change()
+        excess_returns = benchmark_returns.rsub(portfolio_returns, axis=0)
+        excess_return_dollars = self.__benchmark_performance.rsub(self.__back_test_results["Portfolio_Dollars"],
+                                                                  axis=0)
+        tracking_error = excess_returns.rolling(self.__tracking_error_window).std() * np.sqrt(252)
+        return excess_returns, excess_return_dollars, tracking_error
+
+    def __build_chart_data(self):
+        """
+        Precompute the data of each chart once, without modifying the back-test results
+        :return: a dictionary with the kind, the data, the title, the grid, the size and the opacity of each chart
+        :rtype: dict
+        """
+        growth_rates = pd.Series(self.growth_rates, name="g", dtype=float).dropna()
+        performance = self.__back_test_results["Portfolio_Dollars"]
+        chart_data = {
+            "performance": ("line", performance, "Portfolio Performance 1-Y Back-Test", True, (10, 5), 1),
+            "performance_vs_benchmark": ("line", performance.to_frame().join(self.__benchmark_performance),
+                                         "Portfolio Performance 1-Y Back-Test vs. Benchmark", True, (10, 5), 1),
+            "excess_growth": ("hist", self.__excess_return_dollars, None, True, None, 0.5),
+            "tracking_error": ("line", self.__tracking_error,
+                               f"Tracking Error ({self.__tracking_error_window}-Day Rolling)", True, (10, 5), 1),
+            "growth_rates_comparison": ("bar", growth_rates.sort_values(ascending=False), None, False, None, 1),
+            "weights": ("barh", self.__back_test_class.get_weights()["weights"].sort_values(), None, True, (10, 5), 1)
+        }
+        keys = ("kind", "data", "title", "grid", "figsize", "alpha")
+        return {name: dict(zip(keys, chart)) for name, chart in chart_data.items()}
+
+    def __plot(self, name):
+        """
+        Draw a precomputed chart with pandas on the current matplotlib figure
+        :param str name: name of the chart
+        :return: the chart
+        :rtype: matplotlib.axes.Axes
+        """
+        chart = self.__chart_data[name]
+        return chart["data"].plot(kind=chart["kind"], title=chart["title"], grid=chart["grid"],
+                                  figsize=chart["figsize"], alpha=chart["alpha"])
 
     def __calculate_performance(self):
         """
@@ -45,30 +107,31 @@ class PortfolioAnalytics:
         :return: a chart with the performance
         :rtype: matplotlib.axes._subplots.AxesSubplot
         """
-        return self.__back_test_results["Portfolio_Dollars"].plot(title="Portfolio Performance 1-Y Back-Test",
-                                                                  grid=True,
-                                                                  figsize=(10, 5)
-                                                                  )
+        return self.__plot("performance")
 
     def __calculate_performance_vs_benchmark(self):
         """
-        Calculate the performance against the benchmark (DJIA)
-        :return: a chart with the performance of the index against the benchmark
+        Calculate the performance against the benchmarks
+        :return: a chart with the performance of the index against the benchmarks
         :rtype: matplotlib.axes._subplots.AxesSubplot
         """
-        self.__back_test_results["Benchmark_Performance"] = self.__djia_data["Dollar_Performance"]
-        return self.__back_test_results[["Portfolio_Dollars", "Benchmark_Performance"]].plot(
-            title="Portfolio Performance 1-Y Back-Test vs. Benchmark", grid=True, figsize=(10, 5))
+        return self.__plot("performance_vs_benchmark")
 
     def __analyze_excess_growth(self):
         """
-        Analyze graphically the excess growth of the Portfolio over the benchmark
+        Analyze graphically the excess growth of the Portfolio over the benchmarks
         :return: a histogram with the results
         :rtype: matplotlib.axes._subplots.AxesSubplot
         """
-        self.__back_test_results["Excess_Return_Dollars"] = \
-            self.__back_test_results["Portfolio_Dollars"] - self.__back_test_results["Benchmark_Performance"]
-        return self.__back_test_results["Excess_Return_Dollars"].plot(kind="hist", grid=True)
+        return self.__plot("excess_growth")
+
+    def __show_tracking_error(self):
+        """
+        Show the rolling tracking error of the Portfolio against the benchmarks
+        :return: a chart with the tracking errors
+        :rtype: matplotlib.axes._subplots.AxesSubplot
+        """
+        return self.__plot("tracking_error")
 
     def __compare_growth_rates(self):
         """
@@ -76,10 +139,7 @@ class PortfolioAnalytics:
         :return: a chart with the different growth rates
         :rtype: matplotlib.axes._subplots.AxesSubplot
         """
-        growth_rates = self.growth_rates
-        growth_df = pd.DataFrame(index=list(growth_rates.keys()), data={"g": list(growth_rates.values())})
-        growth_df.dropna(inplace=True)
-        return growth_df["g"].sort_values(ascending=False).plot(kind="bar")
+        return self.__plot("growth_rates_comparison")
 
     def __show_weights(self):
         """
@@ -87,8 +147,7 @@ class PortfolioAnalytics:
         :return: a pie chart with the weights for each stock
         :rtype: matplotlib.axes._subplots.AxesSubplot
         """
-        weights_df = self.__back_test_class.get_weights()
-        return weights_df['weights'].sort_values().plot(kind="barh", grid=True, figsize=(10, 5))
+        return self.__plot("weights")
 
     def __build_results(self):
         """
@@ -100,7 +159,56 @@ class PortfolioAnalytics:
             "performance": self.__calculate_performance,
             "performance_vs_benchmark": self.__calculate_performance_vs_benchmark,
             "excess_growth": self.__analyze_excess_growth,
+            "tracking_error": self.__show_tracking_error,
             "growth_rates_comparison": self.__compare_growth_rates,
             "weights": self.__show_weights
         }
         return results
+
+    def get_chart_data(self):
+        """
+        Get the precomputed data of the charts, e.g. to render them with a ChartRenderer
+        :return: a dictionary with the kind, the data, the title, the grid, the size and the opacity of each chart
+        :rtype: dict
+        """
+        return self.__chart_data
+
+    def get_benchmark_performance(self):
+        """
+        Get the dollar performance of the benchmarks on the dates of the portfolio
+        :return: a DataFrame with a column for each benchmark
+        :rtype: pd.DataFrame
+        """
+        return self.__benchmark_performance
+
+    def get_excess_returns(self):
+        """
+        Get the daily returns of the portfolio in excess of each benchmark
+        :return: a DataFrame with a column for each benchmark
+        :rtype: pd.DataFrame
+        """
+        return self.__excess_returns
+
+    def get_excess_return_dollars(self):
+        """
+        Get the dollar performance of the portfolio in excess of each benchmark
+        :return: a DataFrame with a column for each benchmark
+        :rtype: pd.DataFrame
+        """
+        return self.__excess_return_dollars
+
+    def get_tracking_error(self):
+        """
+        Get the annualized rolling tracking error of the portfolio against each benchmark
+        :return: a DataFrame with a column for each benchmark
+        :rtype: pd.DataFrame
+        """
+        return self.__tracking_error
+
+    def get_dropped_benchmarks(self):
+        """
+        Get the benchmarks left out of the comparison
+        :return: a dictionary with the reason for each dropped benchmark
+        :rtype: dict
+        """
+        return self.__dropped_benchmarks
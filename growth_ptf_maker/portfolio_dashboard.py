@@ -1,32 +1,136 @@
 """Generate the portfolio composition, analytics and risk metrics"""
 
-import pandas as pd
+from datetime import datetime, timedelta
 
 from .backtest import BackTest
+from .chart_renderer import ChartRenderer
 from .component_weights import GrowthAndWeights
+from .datashelf import DataShelf
+from .instrumentation import NULL_METRICS
+from .market_data import MarketData
 from .performance import Performance
 from .portfolio_analytics import PortfolioAnalytics
+from .price_store import PriceStore
+from .results_store import ResultsStore
 from .risk_metrics import RiskMetrics
 
 
 class PortfolioDashboard:
     """Calculate and generates the portfolio weights for each stock"""
 
-    def __init__(self, back_test_years_window=1, start_date="2021-01-01", end_date=None):
+    def __init__(self, back_test_years_window=1, start_date="2021-01-01", end_date=None, price_store_path=None,
+                 data_provider=None, tickers=None, growth_rates=None, metrics=None, results_store_path=None,
+                 benchmarks=PortfolioAnalytics.DEFAULT_BENCHMARKS):
         """
-        Initialize the class with the given inputs
+        Initialize the class with the given inputs, each stage is computed the first time its results are requested
         :param int back_test_years_window: years to use to back-test the constructed portfolio
+        :param str start_date: start date of the performance
+        :param str end_date: end date of the performance
+        :param str price_store_path: folder of the local price store (defaults to ./price_store)
+        :param DataProvider data_provider: backend of the market data (a Yahoo! Finance PriceStore if None)
+        :param list tickers: list of tickers of the portfolio (the DataShelf tickers if None)
+        :param dict growth_rates: growth rate of each ticker (inferred with CalculateG if None)
+        :param Metrics metrics: metrics collecting the stage timings, the requests, the cache hits and misses and the
+        failed tickers, with the callbacks to notify (nothing is collected if None)
+        :param str results_store_path: folder of the weights, growth rates and back-test results (defaults to
+        ./results_store, not used with a data_provider unless given, so that offline runs only depend on their inputs)
+        :param tuple benchmarks: tickers of the benchmarks of the analytics
         """
-        self.__growth_and_weights = GrowthAndWeights()
-        self.__weights = pd.read_csv("weights.csv", index_col=0)
-        self.__back_test_results = BackTest(self.__growth_and_weights.get_ticker_list(),
-                                            self.__weights,
-                                            back_test_years_window
-                                            )
-        self.__risk_metrics = RiskMetrics(self.__back_test_results).results
-        self.__portfolio_analytics = PortfolioAnalytics(self.__growth_and_weights.get_growth_rates(),
-                                                        self.__back_test_results, back_test_years_window).results
-        self.__portfolio_returns = Performance(start_date, end_date).portfolio_returns()
+        self.__back_test_years_window = back_test_years_window
+        self.__start_date = start_date
+        self.__end_date = end_date
+        self.__price_store_path = price_store_path
+        self.__data_provider = data_provider
+        self.__tickers = tickers
+        self.__growth_rates = growth_rates
+        self.__metrics = metrics or NULL_METRICS
+        self.__results_store_path = results_store_path
+        self.__saves_results = data_provider is None or results_store_path is not None
+        self.__benchmarks = benchmarks
+        self.__stages = dict()
+
+    def __stage(self, name, builder):
+        """
+        Compute a stage the first time it is requested, timing it, and memoize it
+        :param str name: name of the stage
+        :param callable builder: function computing the stage, resolving its own dependencies
+        :return: the result of the stage
+        :rtype: object
+        """
+        if name not in self.__stages:
+            with self.__metrics.stage(name):
+                self.__stages[name] = builder()
+        return self.__stages[name]
+
+    def __growth_and_weights(self):
+        """
+        Get the inferred growth rates and the calculated weights
+        :return: the growth and weights object
+        :rtype: GrowthAndWeights
+        """
+        return self.__stage("growth_and_weights", lambda: GrowthAndWeights(self.__tickers, self.__growth_rates,
+                                                                           self.__metrics, self.__results_store(),
+                                                                           save_results=self.__saves_results))
+
+    def __results_store(self):
+        """
+        Get the store of the weights, the growth rates and the back-test results
+        :return: the results store, or None if the results are not saved
+        :rtype: ResultsStore
+        """
+        return self.__stage("results_store", lambda: ResultsStore(self.__results_store_path)
+                            if self.__saves_results else None)
+
+    def __ticker_list(self):
+        """
+        Get the tickers of the portfolio universe
+        :return: a list of tickers
+        :rtype: list
+        """
+        return self.__stage("ticker_list", lambda: self.__tickers if self.__tickers is not None
+                            else DataShelf().get_ticker_list())
+
+    def __weights(self):
+        """
+        Get the saved weights, calculating them only if no weights are saved yet or if the results are not saved
+        :return: a Pandas DataFrame with the weights
+        :rtype: pd.DataFrame
+        """
+        def load_weights():
+            if self.__results_store() is None:
+                return self.__growth_and_weights().get_component_weights()
+            if not self.__results_store().has(ResultsStore.WEIGHTS):
+                self.__growth_and_weights()
+            return self.__results_store().get_frame(ResultsStore.WEIGHTS)
+        return self.__stage("weights", load_weights)
+
+    def __market_data(self):
+        """
+        Get the market data shared by the back-test, the analytics and the performance
+        :return: the market data session covering the union of the dates they need
+        :rtype: MarketData
+        """
+        def build_market_data():
+            data_provider = self.__data_provider or PriceStore(self.__price_store_path, metrics=self.__metrics)
+            back_test_start_date = datetime.today() - timedelta(days=(self.__back_test_years_window * 365))
+            session_start_date = min(data_provider.parse_date(str(back_test_start_date)),
+                                     data_provider.parse_date(self.__start_date))
+            return MarketData(str(session_start_date), data_provider=data_provider, metrics=self.__metrics)
+        return self.__stage("market_data", build_market_data)
+
+    def __back_test(self):
+        """
+        Get the back-test of the saved weights, saving its results in the results store
+        :return: the back-test object
+        :rtype: BackTest
+        """
+        def build_back_test():
+            back_test = BackTest(self.__ticker_list(), self.__weights(), self.__back_test_years_window,
+                                 self.__market_data())
+            if self.__results_store() is not None:
+                self.__results_store().save(ResultsStore.BACK_TEST, back_test.get_back_test_results())
+            return back_test
+        return self.__stage("back_test", build_back_test)
 
     def back_test_results(self):
         """
@@ -35,8 +139,8 @@ class PortfolioDashboard:
         :rtype: dict
         """
         results = {
-            "weights": self.__back_test_results.get_weights(),
-            "back_test": self.__back_test_results.get_back_test_results()
+            "weights": self.__back_test().get_weights(),
+            "back_test": self.__back_test().get_back_test_results()
         }
         return results
 
@@ -46,7 +150,19 @@ class PortfolioDashboard:
         :return: the results of the calculated risk metrics
         :rtype: dict
         """
-        return self.__risk_metrics
+        return self.__stage("risk_metrics", lambda: RiskMetrics(self.__back_test()).results)
+
+    def __portfolio_analytics(self):
+        """
+        Get the analytics of the Portfolio with the precomputed chart data
+        :return: the portfolio analytics object
+        :rtype: PortfolioAnalytics
+        """
+        return self.__stage("analytics", lambda: PortfolioAnalytics(self.__growth_and_weights().get_growth_rates(),
+                                                                    self.__back_test(),
+                                                                    self.__back_test_years_window,
+                                                                    self.__market_data(),
+                                                                    self.__benchmarks))
 
     def analytics(self):
         """
@@ -54,7 +170,20 @@ class PortfolioDashboard:
         :return: the portfolio analytics object
         :rtype: dict
         """
-        return self.__portfolio_analytics
+        return self.__portfolio_analytics().results
+
+    def render_charts(self, output_dir=None, formats=("png",), max_workers=1):
+        """
+        Render all the charts of the analytics to files with the Agg backend, without a display
+        :param str output_dir: folder of the rendered charts (defaults to ./charts)
+        :param tuple formats: file formats of the charts, among "png" and "svg"
+        :param int max_workers: number of processes rendering the charts
+        :return: a dictionary with the file paths of each chart
+        :rtype: dict
+        """
+        chart_data = self.__portfolio_analytics().get_chart_data()
+        with self.__metrics.stage("render_charts"):
+            return ChartRenderer(output_dir, formats, max_workers=max_workers).render(chart_data)
 
     def portfolio_returns(self):
         """
@@ -62,12 +191,23 @@ class PortfolioDashboard:
         :return: the returns calculated from the given range
         :rtype: pd.DataFrame
         """
-        return self.__portfolio_returns
+        return self.__stage("portfolio_returns", lambda: Performance(self.__start_date, self.__end_date,
+                                                                     self.__market_data(),
+                                                                     weights=self.__weights()).portfolio_returns())
+
+    def get_metrics(self):
+        """
+        Get the metrics of the stages computed so far
+        :return: the metrics object, whose get_results returns the stage timings, the requests, the counters and the
+        failed tickers
+        :rtype: Metrics
+        """
+        return self.__metrics
 
     def update_weights(self):
         """
-        Replace the weights CSV file with the current calculated weights
-        :return: a saved CSV file
-        :rtype: csv
+        Save the current calculated weights as the latest version of the weights in the results store
+        :return: the path of the saved weights
+        :rtype: str
         """
-        return self.__growth_and_weights.update_weights()
+        return self.__growth_and_weights().update_weights()
@@ -0,0 +1,74 @@
+"""Assemble the date x ticker matrix of prices in a single pass"""
+
+import pandas as pd
+
+
+class PricePanel:
+    """Build the matrix of prices of many tickers with an explicit alignment policy"""
+
+    JOIN_POLICIES = ("inner", "outer", "ffill")
+
+    def __init__(self, historical_data, tickers=None, join="inner", price_column="Adj Close"):
+        """
+        Initialize the class with the given inputs
+        :param dict historical_data: dictionary with a DataFrame of historical data (with a Date column) for each ticker
+        :param list tickers: tickers to keep in the panel (all the tickers in historical_data if None)
+        :param str join: alignment policy of the dates, one of "inner", "outer" or "ffill" (outer, then forward-filled)
+        :param str price_column: column of the historical data to use as price
+        """
+        if join not in self.JOIN_POLICIES:
+            raise ValueError(f"Unknown join policy '{join}', expected one of {', '.join(self.JOIN_POLICIES)}")
+        self.__historical_data = historical_data
+        self.__tickers = set(tickers) if tickers is not None else None
+        self.__join = join
+        self.__price_column = price_column
+        self.__dropped_tickers = dict()
+        self.__panel = self.__build_panel()
+
+    def __select_series(self):
+        """
+        Select the price series to put in the panel, recording the tickers dropped
+        :return: a dictionary with the price series indexed by date for each kept ticker
+        :rtype: dict
+        """
+        selected_series = dict()
+        for ticker, history in self.__historical_data.items():
+            if self.__tickers is not None and ticker not in self.__tickers:
+                self.__dropped_tickers[ticker] = "not requested"
+            elif history is None or history.empty:
+                self.__dropped_tickers[ticker] = "no data"
+            else:
+                selected_series[ticker] = pd.Series(history[self.__price_column].to_numpy(),
+                                                    index=pd.Index(history["Date"], name="Date"))
+        return selected_series
+
+    def __build_panel(self):
+        """
+        Assemble the selected series in a single concatenation
+        :return: a DataFrame with the dates as index and the tickers as columns
+        :rtype: pd.DataFrame
+        """
+        selected_series = self.__select_series()
+        if not selected_series:
+            return pd.DataFrame(index=pd.Index([], name="Date"))
+        panel = pd.concat(selected_series, axis=1, join="inner" if self.__join == "inner" else "outer").sort_index()
+        if self.__join == "ffill":
+            panel = panel.ffill()
+        panel.index.name = "Date"
+        return panel
+
+    def get_panel(self):
+        """
+        Get the matrix of prices
+        :return: a DataFrame with the dates as index and the tickers as columns
+        :rtype: pd.DataFrame
+        """
+        return self.__panel
+
+    def get_dropped_tickers(self):
+        """
+        Get the tickers left out of the panel
+        :return: a dictionary with the reason for each dropped ticker
+        :rtype: dict
+        """
+        return self.__dropped_tickers
@@ -0,0 +1,318 @@
+"""Persist the downloaded price histories locally and top them up incrementally"""
+
+import json
+import os
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .concurrent_downloader import ConcurrentDownloader, RateLimiter
+from .data_providers import DataProvider
+from .instrumentation import NULL_METRICS
+from .yahoo_data_downloader import YahooFinanceDownloader
+
+
+class PriceStore(DataProvider):
+    """Yahoo! Finance backend with an on-disk columnar store of price histories, one Parquet file per ticker"""
+
+    OVERLAP_DAYS = 7
+    ADJUSTMENT_TOLERANCE = 1e-5
+
+    def __init__(self, store_path=None, max_workers=8, requests_per_second=5, metrics=None, price_dtype=None,
+                 timeout=YahooFinanceDownloader.DEFAULT_TIMEOUT):
+        """
+        Initialize the class with the given inputs
+        :param str store_path: folder where the Parquet files are saved (defaults to ./price_store)
+        :param int max_workers: maximum number of concurrent downloads when topping up many tickers
+        :param float requests_per_second: maximum number of requests sent per second when topping up many tickers
+        :param Metrics metrics: metrics counting the store hits and misses and recording the downloads (if not None)
+        :param str price_dtype: dtype of the downloaded prices, e.g. "float32" to halve the memory (float64 if None)
+        :param float timeout: seconds to wait for the connection and for each read of a download
+        """
+        self.__max_workers = max_workers
+        self.__rate_limiter = RateLimiter(requests_per_second)
+        self.__metrics = metrics or NULL_METRICS
+        self.__parse_options = {"columns": YahooFinanceDownloader.PRICE_COLUMNS, "price_dtype": price_dtype,
+                                "stream": True, "timeout": timeout}
+        self.__failures = dict()
+        self.__store_path = store_path or os.path.join(os.getcwd(), "price_store")
+        os.makedirs(self.__store_path, exist_ok=True)
+        self.__coverage_file_path = os.path.join(self.__store_path, "coverage.json")
+        self.__coverage = self.__load_coverage()
+
+    def __load_coverage(self):
+        """
+        Load the date ranges already downloaded for each ticker
+        :return: a dictionary with the covered start and end date for each ticker
+        :rtype: dict
+        """
+        if not os.path.exists(self.__coverage_file_path):
+            return dict()
+        with open(self.__coverage_file_path, "r") as coverage_file:
+            return json.load(coverage_file)
+
+    def __save_coverage(self):
+        """
+        Save the date ranges already downloaded for each ticker
+        :return: a saved JSON file
+        :rtype: None
+        """
+        with open(self.__coverage_file_path, "w") as coverage_file:
+            json.dump(self.__coverage, coverage_file, indent=2, sort_keys=True)
+
+    def __ticker_file_path(self, ticker):
+        """
+        Build the path of the Parquet file of a ticker
+        :param str ticker: ticker of the file
+        :return: the path of the Parquet file
+        :rtype: str
+        """
+        return os.path.join(self.__store_path, f"{ticker}.parquet")
+
+    def __missing_ranges(self, ticker, start_date, end_date):
+        """
+        Find the date ranges not yet downloaded for the ticker
+        :param str ticker: ticker to check
+        :param pd.Timestamp start_date: start date of the requested period
+        :param pd.Timestamp end_date: end date of the requested period
+        :return: a list of (start, end) tuples to download, with end set to None for "up to now", each overlapping the
+        stored prices to check their adjustment basis
+        :rtype: list
+        """
+        today = pd.Timestamp(datetime.today()).normalize()
+        query_end = None if end_date >= today else end_date
+        if ticker not in self.__coverage:
+            return [(start_date, query_end)]
+        covered_start = pd.Timestamp(self.__coverage[ticker]["start"])
+        covered_end = pd.Timestamp(self.__coverage[ticker]["end"])
+        missing_ranges = list()
+        if start_date < covered_start:
+            missing_ranges.append((start_date, covered_start + pd.Timedelta(days=self.OVERLAP_DAYS)))
+        if end_date > covered_end:
+            missing_ranges.append((covered_end - pd.Timedelta(days=self.OVERLAP_DAYS), query_end))
+        return missing_ranges
+
+    def __count_lookup(self, missing_ranges):
+        """
+        Count a lookup of the store as a hit if nothing is missing, as a miss otherwise
+        :param list missing_ranges: date ranges not yet downloaded for the ticker
+        :return: the missing ranges
+        :rtype: list
+        """
+        self.__metrics.increment("price_store_misses" if missing_ranges else "price_store_hits")
+        return missing_ranges
+
+    def __read_stored_prices(self, ticker):
+        """
+        Read the stored prices for the ticker
+        :param str ticker: ticker to read
+        :return: a DataFrame with the stored prices or None if nothing is stored yet
+        :rtype: pd.DataFrame
+        """
+        file_path = self.__ticker_file_path(ticker)
+        if not os.path.exists(file_path):
+            return None
+        return pd.read_parquet(file_path)
+
+    @staticmethod
+    def __format_range(start_date, end_date):
+        """
+        Format a date range in the string format accepted by the downloaders
+        :param pd.Timestamp start_date: start date of the range
+        :param pd.Timestamp end_date: end date of the range or None to download up to now
+        :return: the formatted start and end dates
+        :rtype: tuple
+        """
+        return start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d") if end_date is not None else None
+
+    @staticmethod
+    def __format_downloaded(downloaded):
+        """
+        Format the downloaded prices to be merged in the store
+        :param pd.DataFrame downloaded: prices as parsed by the downloader
+        :return: the prices with the dates parsed
+        :rtype: pd.DataFrame
+        """
+        downloaded["Date"] = pd.to_datetime(downloaded["Date"])
+        return downloaded
+
+    def __download(self, ticker, start_date, end_date):
+        """
+        Download the prices of the ticker for the given range
+        :param str ticker: ticker to download
+        :param pd.Timestamp start_date: start date of the range
+        :param pd.Timestamp end_date: end date of the range or None to download up to now
+        :return: a DataFrame with the downloaded prices
+        :rtype: pd.DataFrame
+        """
+        query_start, query_end = self.__format_range(start_date, end_date)
+        return self.__format_downloaded(YahooFinanceDownloader(ticker, query_start, query_end, metrics=self.__metrics,
+                                                               **self.__parse_options).get_parsed_results())
+
+    def __rebase(self, stored_prices, downloaded):
+        """
+        Rescale the stored prices on the adjustment basis of the downloaded ones, which changes after every dividend or
+        split and applies to all the earlier prices with the same factor
+        :param pd.DataFrame stored_prices: prices already stored for the ticker
+        :param list downloaded: list of non-empty DataFrames with the downloaded prices
+        :return: the stored prices on the basis of the downloaded ones, or None if they cannot be reconciled
+        :rtype: pd.DataFrame
+        """
+        overlap = stored_prices.merge(pd.concat(downloaded).drop_duplicates(subset="Date", keep="last"), on="Date",
+                                      suffixes=("_stored", "_downloaded")).dropna(subset=["Adj Close_stored",
+                                                                                          "Adj Close_downloaded"])
+        if overlap.empty:
+            return None
+        ratios = (overlap["Adj Close_downloaded"] / overlap["Adj Close_stored"]).to_numpy(dtype=float)
+        if not np.allclose(ratios, ratios[-1], rtol=self.ADJUSTMENT_TOLERANCE, atol=0):
+            return None
+        if np.isclose(ratios[-1], 1, rtol=self.ADJUSTMENT_TOLERANCE, atol=0):
+            return stored_prices
+        self.__metrics.increment("price_store_rebases")
+        stored_prices["Adj Close"] = stored_prices["Adj Close"] * ratios[-1]
+        return stored_prices
+
+    @staticmethod
+    def __covered_end(stored_prices, covered_end, end_date):
+        """
+        Find the end of the covered range: the requested end date of a past range, else the last date actually
+        received before today, as today's bar may still change or be missing
+        :param pd.DataFrame stored_prices: stored prices of the ticker, or None if there are none
+        :param pd.Timestamp covered_end: end of the range covered so far, kept if no bar is stored
+        :param pd.Timestamp end_date: end date of the requested period
+        :return: the end of the covered range
+        :rtype: pd.Timestamp
+        """
+        today = pd.Timestamp(datetime.today()).normalize()
+        if stored_prices is not None and (stored_prices["Date"] < today).any():
+            covered_end = stored_prices["Date"].loc[stored_prices["Date"] < today].max()
+        return max(covered_end, end_date) if end_date < today else covered_end
+
+    def __merge(self, ticker, downloaded, start_date, end_date):
+        """
+        Merge the downloaded prices in the stored file and extend the covered range of the ticker, downloading again
+        the whole history if the stored prices cannot be brought on the adjustment basis of the downloaded ones
+        :param str ticker: ticker to merge the prices of
+        :param list downloaded: list of DataFrames with the downloaded prices
+        :param pd.Timestamp start_date: start date of the requested period
+        :param pd.Timestamp end_date: end date of the requested period
+        :return: a DataFrame with all the stored prices for the ticker
+        :rtype: pd.DataFrame
+        """
+        covered = self.__coverage.get(ticker, {"start": start_date.isoformat(), "end": end_date.isoformat()})
+        covered_start = min(pd.Timestamp(covered["start"]), start_date)
+        stored_prices = self.__read_stored_prices(ticker)
+        downloaded = [frame for frame in downloaded if frame is not None and not frame.empty]
+        if stored_prices is not None and not stored_prices.empty and downloaded:
+            stored_prices = self.__rebase(stored_prices, downloaded)
+            if stored_prices is None:
+                self.__metrics.increment("price_store_refetches")
+                downloaded = [self.__download(ticker, covered_start, None)]
+        frames = [frame for frame in [stored_prices] + downloaded if frame is not None and not frame.empty]
+        if frames:
+            stored_prices = pd.concat(frames, ignore_index=True)
+            stored_prices = stored_prices.drop_duplicates(subset="Date", keep="last")
+            stored_prices = stored_prices.sort_values("Date").reset_index(drop=True)
+            stored_prices.to_parquet(self.__ticker_file_path(ticker), index=False)
+        self.__coverage[ticker] = {
+            "start": covered_start.isoformat(),
+            "end": self.__covered_end(stored_prices, pd.Timestamp(covered["end"]), end_date).isoformat()
+        }
+        return stored_prices
+
+    def __top_up(self, ticker, start_date, end_date):
+        """
+        Download only the missing dates of the requested range and merge them in the stored file
+        :param str ticker: ticker to top up
+        :param pd.Timestamp start_date: start date of the requested period
+        :param pd.Timestamp end_date: end date of the requested period
+        :return: a DataFrame with all the stored prices for the ticker
+        :rtype: pd.DataFrame
+        """
+        missing_ranges = self.__count_lookup(self.__missing_ranges(ticker, start_date, end_date))
+        if not missing_ranges:
+            return self.__read_stored_prices(ticker)
+        downloaded = [self.__download(ticker, range_start, range_end) for range_start, range_end in missing_ranges]
+        stored_prices = self.__merge(ticker, downloaded, start_date, end_date)
+        self.__save_coverage()
+        return stored_prices
+
+    def __top_up_many(self, tickers, start_date, end_date):
+        """
+        Download in parallel the missing dates of the requested range for many tickers
+        :param list tickers: list of tickers to top up
+        :param pd.Timestamp start_date: start date of the requested period
+        :param pd.Timestamp end_date: end date of the requested period
+        :return: a dictionary with all the stored prices for each ticker topped up successfully
+        :rtype: dict
+        """
+        tickers_by_range = dict()
+        for ticker in tickers:
+            for missing_range in self.__count_lookup(self.__missing_ranges(ticker, start_date, end_date)):
+                tickers_by_range.setdefault(missing_range, list()).append(ticker)
+        downloaded = {ticker: list() for ticker in tickers}
+        failed_tickers = set()
+        for (range_start, range_end), range_tickers in tickers_by_range.items():
+            query_start, query_end = self.__format_range(range_start, range_end)
+            downloader = ConcurrentDownloader(range_tickers, query_start, query_end, self.__max_workers,
+                                              rate_limiter=self.__rate_limiter, metrics=self.__metrics,
+                                              **self.__parse_options)
+            for ticker, parsed_results in downloader.get_parsed_results().items():
+                downloaded[ticker].append(self.__format_downloaded(parsed_results))
+            self.__failures.update(downloader.get_failures())
+            failed_tickers.update(downloader.get_failures())
+        stored_prices = dict()
+        for ticker in tickers:
+            if ticker in failed_tickers:
+                continue
+            if downloaded[ticker]:
+                stored_prices[ticker] = self.__merge(ticker, downloaded[ticker], start_date, end_date)
+            else:
+                stored_prices[ticker] = self.__read_stored_prices(ticker)
+        self.__save_coverage()
+        return stored_prices
+
+    def get_prices(self, ticker, start_date, end_date=None):
+        """
+        Get the prices of the ticker, downloading only the dates not yet stored
+        :param str ticker: ticker to get the prices of
+        :param str start_date: start date of the query period in a string format YYYY-MM-DD (or similar)
+        :param str end_date: end date of the query period in a string format YYYY-MM-DD (or similar)
+        :return: a DataFrame with the prices in the requested range
+        :rtype: pd.DataFrame
+        """
+        start_date = self.parse_date(start_date)
+        end_date = self.parse_date(end_date)
+        return self.slice_prices(self.__top_up(ticker, start_date, end_date), start_date, end_date)
+
+    def get_many_prices(self, tickers, start_date, end_date=None):
+        """
+        Get the prices of many tickers, downloading in parallel only the dates not yet stored
+        :param list tickers: list of tickers to get the prices of
+        :param str start_date: start date of the query period in a string format YYYY-MM-DD (or similar)
+        :param str end_date: end date of the query period in a string format YYYY-MM-DD (or similar)
+        :return: a dictionary with the prices in the requested range for each ticker downloaded successfully
+        :rtype: dict
+        """
+        start_date = self.parse_date(start_date)
+        end_date = self.parse_date(end_date)
+        stored_prices = self.__top_up_many(list(dict.fromkeys(tickers)), start_date, end_date)
+        return {ticker: self.slice_prices(prices, start_date, end_date) for ticker, prices in stored_prices.items()}
+
+    def get_failures(self):
+        """
+        Get the tickers which could not be downloaded by the parallel top-ups
+        :return: a dictionary with the reason of the failure for each ticker
+        :rtype: dict
+        """
+        return self.__failures
+
+    def get_store_path(self):
+        """
+        Get the folder where the Parquet files are saved
+        :return: the path of the store
+        :rtype: str
+        """
+        return self.__store_path
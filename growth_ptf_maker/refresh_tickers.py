@@ -1,27 +1,101 @@
 """Module to get the list of tickers from Wikipedia"""
 
+import json
+import os
 import requests
 
-from bs4 import BeautifulSoup
+from datetime import datetime, timedelta
+from importlib.util import find_spec
+
+from bs4 import BeautifulSoup, SoupStrainer
 
 
 class GetTickers:
     """Get tickers from Wikipedia"""
+    URL = "https://en.wikipedia.org/wiki/Dow_Jones_Industrial_Average"
 
-    def __init__(self):
-        """Executes the functions when the class is created"""
-        self.__tickers = self.__parse_tickers()
+    def __init__(self, revalidate_after_hours=24):
+        """
+        Executes the functions when the class is created
+        :param float revalidate_after_hours: hours during which the saved constituents are used without asking Wikipedia
+        """
+        self.__saved_file_path = os.path.join(os.getcwd(), "djia_constituents.json")
+        self.__revalidate_after = timedelta(hours=revalidate_after_hours)
+        self.__saved_constituents = self.__load_saved_constituents()
+        self.__tickers = self.__refresh_tickers()
+
+    def __load_saved_constituents(self):
+        """
+        Load the constituents saved by the previous runs
+        :return: a dictionary with the tickers, the validators of the page and the last check time, or None
+        :rtype: dict
+        """
+        if not os.path.exists(self.__saved_file_path):
+            return None
+        with open(self.__saved_file_path, "r") as saved_file:
+            return json.load(saved_file)
+
+    def __save_constituents(self, tickers, etag, last_modified):
+        """
+        Save the constituents along with the validators of the page
+        :param list tickers: list of tickers
+        :param str etag: ETag header of the page
+        :param str last_modified: Last-Modified header of the page
+        :return: the saved constituents
+        :rtype: dict
+        """
+        self.__saved_constituents = {
+            "tickers": tickers,
+            "etag": etag,
+            "last_modified": last_modified,
+            "checked": datetime.now().isoformat()
+        }
+        with open(self.__saved_file_path, "w") as saved_file:
+            json.dump(self.__saved_constituents, saved_file, indent=2)
+        return self.__saved_constituents
 
-    def __parse_tickers(self):
+    def __refresh_tickers(self):
         """
-        Get the tickers from Wikipedia
+        Revalidate the saved constituents with a conditional request, falling back on them when offline or when the
+        page cannot be parsed
         :return: a list of tickers
         :rtype: list
         """
-        wiki_page = requests.get("https://en.wikipedia.org/wiki/Dow_Jones_Industrial_Average").text
-        parsed_page = BeautifulSoup(wiki_page, "html.parser")
+        saved = self.__saved_constituents
+        if saved and datetime.now() - datetime.fromisoformat(saved["checked"]) < self.__revalidate_after:
+            return saved["tickers"]
+        headers = dict()
+        if saved and saved.get("etag"):
+            headers["If-None-Match"] = saved["etag"]
+        if saved and saved.get("last_modified"):
+            headers["If-Modified-Since"] = saved["last_modified"]
+        try:
+            response = requests.get(self.URL, headers=headers, timeout=30)
+            if response.status_code == 304 and saved:
+                return self.__save_constituents(saved["tickers"], saved.get("etag"),
+                                                saved.get("last_modified"))["tickers"]
+            response.raise_for_status()
+            tickers = self.__parse_tickers(response.content)
+        except (requests.RequestException, ValueError):
+            if saved:
+                return saved["tickers"]
+            raise
+        return self.__save_constituents(tickers, response.headers.get("ETag"),
+                                        response.headers.get("Last-Modified"))["tickers"]
+
+    def __parse_tickers(self, wiki_page):
+        """
+        Get the tickers from the constituents table of the Wikipedia page
+        :param bytes wiki_page: content of the Wikipedia page
+        :return: a list of tickers
+        :rtype: list
+        """
+        html_parser = "lxml" if find_spec("lxml") is not None else "html.parser"
+        parsed_page = BeautifulSoup(wiki_page, html_parser, parse_only=SoupStrainer(id="constituents"))
         tickers_table = parsed_page.find(id="constituents")
-        a_tags = [row.findAll("a") for row in tickers_table.findAll("td") if row.findAll("a")]
+        if tickers_table is None:
+            raise ValueError("The constituents table is missing from the Wikipedia page")
+        a_tags = [row.find_all("a") for row in tickers_table.find_all("td") if row.find_all("a")]
         flatten_tags = list()
         for element in a_tags:
             if len(element) > 1:
@@ -33,6 +107,8 @@ class GetTickers:
         for element in flatten_tags:
             if element.get("rel"):
                 tickers.append(element.get_text())
+        if not tickers:
+            raise ValueError("No ticker found in the constituents table of the Wikipedia page")
         return tickers
 
     def get_tickers(self):
@@ -42,3 +118,11 @@ class GetTickers:
         :rtype: list
         """
         return self.__tickers
+
+    def get_as_of(self):
+        """
+        Get the time at which the tickers were last checked against Wikipedia
+        :return: the as_of timestamp of the tickers
+        :rtype: datetime
+        """
+        return datetime.fromisoformat(self.__saved_constituents["checked"])
@@ -0,0 +1,131 @@
+"""Persist the weights, the growth rates and the back-test results as versioned Arrow IPC files"""
+
+import os
+
+from datetime import date, datetime
+
+import pandas as pd
+import pyarrow as pa
+
+
+class ResultsStore:
+    """Store of versioned results, one uncompressed Arrow IPC file per kind of result and as-of date"""
+
+    WEIGHTS = "weights"
+    GROWTH_RATES = "growth_rates"
+    BACK_TEST = "back_test"
+    LEGACY_WEIGHTS_FILE = "weights.csv"
+
+    def __init__(self, store_path=None):
+        """
+        Initialize the class with the given inputs
+        :param str store_path: folder where the results are saved (defaults to ./results_store)
+        """
+        self.__store_path = store_path or os.path.join(os.getcwd(), "results_store")
+        os.makedirs(self.__store_path, exist_ok=True)
+        self.__import_legacy_weights()
+
+    def __import_legacy_weights(self):
+        """
+        Import the weights.csv file saved by the previous versions in the current folder, if no weights are stored yet
+        :return: the path of the imported weights, or None if there is nothing to import
+        :rtype: str
+        """
+        if self.get_as_of_dates(self.WEIGHTS) or not os.path.isfile(self.LEGACY_WEIGHTS_FILE):
+            return None
+        as_of = datetime.fromtimestamp(os.path.getmtime(self.LEGACY_WEIGHTS_FILE)).date()
+        return self.save(self.WEIGHTS, pd.read_csv(self.LEGACY_WEIGHTS_FILE, index_col=0), as_of)
+
+    def __file_path(self, kind, as_of):
+        """
+        Build the path of the file of a result
+        :param str kind: kind of result, e.g. ResultsStore.WEIGHTS
+        :param datetime.date as_of: as-of date of the result
+        :return: the path of the Arrow IPC file
+        :rtype: str
+        """
+        return os.path.join(self.__store_path, kind, f"{as_of.isoformat()}.arrow")
+
+    def __resolve_as_of(self, kind, as_of):
+        """
+        Find the latest version of a result saved on or before the given date
+        :param str kind: kind of result
+        :param datetime.date as_of: reference date, None meaning the latest version
+        :return: the as-of date of the version
+        :rtype: datetime.date
+        """
+        as_of_dates = [i for i in self.get_as_of_dates(kind) if as_of is None or i <= as_of]
+        if not as_of_dates:
+            raise FileNotFoundError(f"No {kind} saved in {self.__store_path}" +
+                                    (f" on or before {as_of.isoformat()}" if as_of is not None else ""))
+        return as_of_dates[-1]
+
+    def save(self, kind, frame, as_of=None):
+        """
+        Save a result as the version of the given date, replacing the version of the same date atomically
+        :param str kind: kind of result, e.g. ResultsStore.WEIGHTS
+        :param pd.DataFrame frame: result to save, its index is saved along with the columns
+        :param datetime.date as_of: as-of date of the result (defaults to today)
+        :return: the path of the saved file
+        :rtype: str
+        """
+        file_path = self.__file_path(kind, as_of or date.today())
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        table = pa.Table.from_pandas(frame, preserve_index=True)
+        temporary_file_path = f"{file_path}.tmp"
+        with pa.OSFile(temporary_file_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(temporary_file_path, file_path)
+        return file_path
+
+    def has(self, kind):
+        """
+        Check whether any version of a result is saved
+        :param str kind: kind of result
+        :return: True if at least a version is saved
+        :rtype: bool
+        """
+        return bool(self.get_as_of_dates(kind))
+
+    def get_as_of_dates(self, kind):
+        """
+        Get the as-of dates of the saved versions of a result
+        :param str kind: kind of result
+        :return: a sorted list with the as-of dates
+        :rtype: list
+        """
+        kind_path = os.path.join(self.__store_path, kind)
+        if not os.path.isdir(kind_path):
+            return list()
+        return sorted(date.fromisoformat(i[:-len(".arrow")]) for i in os.listdir(kind_path) if i.endswith(".arrow"))
+
+    def get_table(self, kind, as_of=None):
+        """
+        Get a version of a result as an Arrow table memory-mapped on its file, without copying or parsing it
+        :param str kind: kind of result
+        :param datetime.date as_of: reference date, the latest version saved on or before it is read (None for the
+        latest version)
+        :return: the memory-mapped Arrow table
+        :rtype: pa.Table
+        """
+        with pa.memory_map(self.__file_path(kind, self.__resolve_as_of(kind, as_of)), "r") as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def get_frame(self, kind, as_of=None):
+        """
+        Get a version of a result as a DataFrame with its original index
+        :param str kind: kind of result
+        :param datetime.date as_of: reference date, the latest version saved on or before it is read (None for the
+        latest version)
+        :return: a DataFrame with the result
+        :rtype: pd.DataFrame
+        """
+        return self.get_table(kind, as_of).to_pandas()
+
+    def get_store_path(self):
+        """
+        Get the folder where the results are saved
+        :return: the path of the store
+        :rtype: str
+        """
+        return self.__store_path
@@ -0,0 +1,74 @@
+"""Compute the weighted portfolio returns with whole-array operations"""
+
+import numpy as np
+import pandas as pd
+
+
+class ReturnsEngine:
+    """Compute the weighted component returns, the portfolio returns and the dollar curve of a portfolio"""
+
+    def __init__(self, prices, weights):
+        """
+        Initialize the class with the given inputs
+        :param pd.DataFrame prices: DataFrame of prices with the dates as index and the tickers as columns
+        :param pd.Series weights: weights of the components indexed by ticker
+        """
+        self.__prices = prices
+        self.__weights = self.__align_weights(weights)
+        self.__weighted_returns, self.__portfolio, self.__portfolio_dollars = \
+            self.calculate(self.__prices.to_numpy(dtype=float), self.__weights)
+
+    def __align_weights(self, weights):
+        """
+        Align the weights on the columns of the prices once
+        :param pd.Series weights: weights of the components indexed by ticker
+        :return: the vector of weights in the same order as the columns of the prices
+        :rtype: np.ndarray
+        """
+        missing_tickers = self.__prices.columns.difference(weights.index)
+        if len(missing_tickers):
+            raise KeyError(f"Missing weights for the tickers: {', '.join(missing_tickers)}")
+        return weights.reindex(self.__prices.columns).to_numpy(dtype=float)
+
+    @staticmethod
+    def calculate(prices, weights):
+        """
+        Calculate the weighted returns, the portfolio returns and the dollar curve from a price matrix
+        :param np.ndarray prices: matrix of prices with shape (dates, tickers)
+        :param np.ndarray weights: vector of weights with shape (tickers,) or matrix with shape (dates, tickers)
+        :return: a tuple with the weighted returns (plus one), the portfolio returns (plus one) and the dollar curve
+        :rtype: tuple
+        """
+        returns = np.full(prices.shape, np.nan)
+        np.divide(prices[1:], prices[:-1], out=returns[1:])
+        returns[1:] -= 1
+        weighted_returns = returns * weights + 1
+        portfolio = np.nanprod(weighted_returns, axis=1)
+        portfolio_dollars = np.cumprod(portfolio) * 100
+        return weighted_returns, portfolio, portfolio_dollars
+
+    def get_results(self):
+        """
+        Get the weighted component returns along with the portfolio returns and the dollar curve
+        :return: a DataFrame with a column for each component plus the Portfolio and Portfolio_Dollars columns
+        :rtype: pd.DataFrame
+        """
+        data = np.column_stack([self.__weighted_returns, self.__portfolio, self.__portfolio_dollars])
+        columns = self.__prices.columns.tolist() + ["Portfolio", "Portfolio_Dollars"]
+        return pd.DataFrame(data, index=self.__prices.index, columns=columns)
+
+    def get_portfolio_returns(self):
+        """
+        Get the daily portfolio returns (plus one)
+        :return: a Series with the portfolio returns
+        :rtype: pd.Series
+        """
+        return pd.Series(self.__portfolio, index=self.__prices.index, name="Portfolio")
+
+    def get_portfolio_dollars(self):
+        """
+        Get the value of 100 dollars invested in the portfolio
+        :return: a Series with the dollar curve
+        :rtype: pd.Series
+        """
+        return pd.Series(self.__portfolio_dollars, index=self.__prices.index, name="Portfolio_Dollars")
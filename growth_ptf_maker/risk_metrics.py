@@ -1,68 +1,90 @@
 """Calculate Risk Metrics for the simulated Portfolio"""
 
+import bisect
+
 import numpy as np
+import pandas as pd
 
 from scipy.stats import norm
 
 from .backtest import BackTest
 
 
-class RiskMetrics:
-    """Calculate the risk indicators for the portfolio"""
+class RiskEngine:
+    """Calculate the parametric VaR, the ES and the historical VaR for many confidence levels in one pass"""
 
-    def __init__(self, back_test_data):
+    def __init__(self, portfolio, confidence_levels):
         """
         Initialize the class with the given parameters
-        :param BackTest back_test_data: Pandas DataFrame with the back-tested data
+        :param np.ndarray portfolio: daily portfolio returns (plus one)
+        :param list confidence_levels: confidence levels in percentage, e.g. [95, 97.5, 99]
         """
-        self.__back_tested_data = back_test_data.get_back_test_results()
-        self.__var_95 = self.__calculate_var(95)
-        self.__var_99 = self.__calculate_var(99)
-        self.__es_97_5 = self.__calculate_es(97.5)
-        self.__hvar_95 = self.__calculate_hvar(95)
-        self.__hvar_99 = self.__calculate_hvar(99)
-        self.__min = self.__back_tested_data["Portfolio"].min() - 1
-        self.__min_max_range = (self.__back_tested_data["Portfolio"].max() -
-                                self.__back_tested_data["Portfolio"].min()) - 1
-        self.results = self.__build_results()
+        portfolio = np.asarray(portfolio, dtype=float)
+        self.__returns = portfolio[~np.isnan(portfolio)] - 1
+        self.__confidence_levels = np.asarray(sorted(set(confidence_levels)), dtype=float)
+        self.__mean = self.__returns.mean()
+        self.__std = self.__returns.std(ddof=1)
+        self.__results = self.__calculate()
 
-    def __calculate_var(self, confidence):
+    def __calculate_hvar(self):
         """
-        Calculate the Market Risk using the Parametric VaR approach given a confidence level
-        :param float confidence: VaR confidence level
-        :return: the calculated VaR value
-        :rtype: float
+        Calculate the Historical VaR for all the confidence levels with a single partial sort
+        :return: the HVaR value for each confidence level
+        :rtype: np.ndarray
         """
-        z = norm.ppf(confidence/100)
-        std = self.__back_tested_data["Portfolio"].std()
-        var = std * z
-        return var
+        size = len(self.__returns)
+        descending_positions = np.array([min(round(level / 100 * size), size - 1)
+                                         for level in self.__confidence_levels])
+        ascending_positions = size - 1 - descending_positions
+        partitioned = np.partition(self.__returns, np.unique(ascending_positions))
+        return np.abs(partitioned[ascending_positions])
 
-    def __calculate_es(self, confidence):
+    def __calculate(self):
         """
-        Calculate the Expected Shortfall with the given confidence interval
-        :param float confidence: ES confidence level
-        :return: the calculated ES value
-        :rtype: float
+        Calculate VaR, ES and HVaR for all the confidence levels from the shared moments
+        :return: a DataFrame indexed by confidence level with the var, es and hvar columns
+        :rtype: pd.DataFrame
         """
-        mu = self.__back_tested_data["Portfolio"].mean() - 1
-        sigma = self.__back_tested_data["Portfolio"].std()
-        x = confidence / 100
+        x = self.__confidence_levels / 100
         u = norm.ppf(x)
-        es = mu + sigma * (np.exp(-u**2/2)/((1-x) * np.sqrt(2*np.pi)))
-        return es
+        var = self.__std * u
+        es = self.__mean + self.__std * (np.exp(-u**2/2)/((1-x) * np.sqrt(2*np.pi)))
+        hvar = self.__calculate_hvar()
+        return pd.DataFrame({"var": var, "es": es, "hvar": hvar},
+                            index=pd.Index(self.__confidence_levels, name="confidence"))
+
+    def get_results(self):
+        """
+        Get the calculated risk measures
+        :return: a DataFrame indexed by confidence level with the var, es and hvar columns
+        :rtype: pd.DataFrame
+        """
+        return self.__results
 
-    def __calculate_hvar(self, confidence):
+
+class RiskMetrics:
+    """Calculate the risk indicators for the portfolio"""
+
+    DEFAULT_CONFIDENCE_LEVELS = (95, 97.5, 99)
+
+    def __init__(self, back_test_data, confidence_levels=DEFAULT_CONFIDENCE_LEVELS):
         """
-        Calculate the Historical VaR for the given pd.Series
-        :param float confidence: HVaR confidence level
-        :return: the calculated HVaR value
-        :rtype: float
+        Initialize the class with the given parameters
+        :param BackTest back_test_data: Pandas DataFrame with the back-tested data
+        :param list confidence_levels: confidence levels of the risk table, in percentage
         """
-        series = self.__back_tested_data["Portfolio"] - 1
-        series.sort_values(ascending=False, inplace=True)
-        index_val = round(confidence / 100 * len(series))
-        return np.abs(series.iloc[index_val])
+        self.__back_tested_data = back_test_data.get_back_test_results()
+        self.__risk_table = RiskEngine(self.__back_tested_data["Portfolio"].to_numpy(),
+                                       list(confidence_levels) + list(self.DEFAULT_CONFIDENCE_LEVELS)).get_results()
+        self.__var_95 = self.__risk_table.at[95, "var"]
+        self.__var_99 = self.__risk_table.at[99, "var"]
+        self.__es_97_5 = self.__risk_table.at[97.5, "es"]
+        self.__hvar_95 = self.__risk_table.at[95, "hvar"]
+        self.__hvar_99 = self.__risk_table.at[99, "hvar"]
+        self.__min = self.__back_tested_data["Portfolio"].min() - 1
+        self.__min_max_range = (self.__back_tested_data["Portfolio"].max() -
+                                self.__back_tested_data["Portfolio"].min()) - 1
+        self.results = self.__build_results()
 
     def __build_results(self):
         """
@@ -80,3 +102,88 @@ class RiskMetrics:
             "min_max_range": self.__min_max_range
         }
         return results
+
+    def get_risk_table(self):
+        """
+        Get VaR, ES and HVaR for all the requested confidence levels
+        :return: a DataFrame indexed by confidence level with the var, es and hvar columns
+        :rtype: pd.DataFrame
+        """
+        return self.__risk_table
+
+
+class RollingRiskMetrics:
+    """Calculate VaR, ES and HVaR over a rolling window with incremental updates"""
+
+    def __init__(self, back_test_data, window=252, confidence_levels=(95, 99)):
+        """
+        Initialize the class with the given parameters
+        :param BackTest back_test_data: Pandas DataFrame with the back-tested data
+        :param int window: number of trading days in the rolling window
+        :param list confidence_levels: confidence levels in percentage, e.g. [95, 99]
+        """
+        self.__portfolio = back_test_data.get_back_test_results()["Portfolio"]
+        self.__window = int(window)
+        self.__confidence_levels = sorted(set(confidence_levels))
+        self.__var, self.__es, self.__hvar = self.__calculate()
+
+    def __calculate(self):
+        """
+        Slide the window over the portfolio returns, updating the running moments and the sorted window
+        :return: a tuple with the VaR, ES and HVaR DataFrames aligned to the back-test index
+        :rtype: tuple
+        """
+        returns = self.__portfolio.to_numpy(dtype=float) - 1
+        window = self.__window
+        x = np.asarray(self.__confidence_levels, dtype=float) / 100
+        u = norm.ppf(x)
+        es_multiplier = np.exp(-u**2/2)/((1-x) * np.sqrt(2*np.pi))
+        hvar_positions = [window - 1 - min(round(level * window), window - 1) for level in x]
+        std = np.full(len(returns), np.nan)
+        mean = np.full(len(returns), np.nan)
+        hvar = np.full((len(returns), len(x)), np.nan)
+        sorted_window = list()
+        running_sum = 0.0
+        running_sum_squares = 0.0
+        for day, value in enumerate(returns):
+            bisect.insort(sorted_window, value)
+            running_sum += value
+            running_sum_squares += value * value
+            if day >= window:
+                leaving_value = returns[day - window]
+                del sorted_window[bisect.bisect_left(sorted_window, leaving_value)]
+                running_sum -= leaving_value
+                running_sum_squares -= leaving_value * leaving_value
+            if day >= window - 1:
+                mean[day] = running_sum / window
+                std[day] = np.sqrt(max(running_sum_squares - running_sum * mean[day], 0.0) / (window - 1))
+                hvar[day] = [abs(sorted_window[position]) for position in hvar_positions]
+        index = self.__portfolio.index
+        columns = pd.Index(self.__confidence_levels, name="confidence")
+        var = pd.DataFrame(np.outer(std, u), index=index, columns=columns)
+        es = pd.DataFrame(mean[:, None] + np.outer(std, es_multiplier), index=index, columns=columns)
+        return var, es, pd.DataFrame(hvar, index=index, columns=columns)
+
+    def get_var(self):
+        """
+        Get the rolling parametric VaR
+        :return: a DataFrame with a column for each confidence level, aligned to the back-test index
+        :rtype: pd.DataFrame
+        """
+        return self.__var
+
+    def get_es(self):
+        """
+        Get the rolling Expected Shortfall
+        :return: a DataFrame with a column for each confidence level, aligned to the back-test index
+        :rtype: pd.DataFrame
+        """
+        return self.__es
+
+    def get_hvar(self):
+        """
+        Get the rolling Historical VaR
+        :return: a DataFrame with a column for each confidence level, aligned to the back-test index
+        :rtype: pd.DataFrame
+        """
+        return self.__hvar
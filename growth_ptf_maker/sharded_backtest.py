@@ -0,0 +1,154 @@
+"""Back-Test a large universe shard by shard with bounded memory"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .growth_cache import GrowthCache
+from .growth_calculator import CalculateG
+from .price_panel import PricePanel
+from .price_store import PriceStore
+from .returns_engine import ReturnsEngine
+from .universes import get_universe
+from .weighting_engine import WeightingEngine
+
+
+class ShardedBackTest:
+    """Infer the growth, download the prices and Back-Test the portfolio of a universe one shard of tickers at a time"""
+
+    def __init__(self, universe, years=1, growth_rates=None, data_provider=None, shard_size=500, join="inner",
+                 weighting_engine=None, growth_cache=None):
+        """
+        Initialize the class with the given inputs
+        :param object universe: universe of the portfolio, a name in UNIVERSES, a ticker file, a list or a Universe
+        :param int years: years to back-test
+        :param dict growth_rates: growth rate of each ticker (inferred shard by shard with CalculateG if None)
+        :param DataProvider data_provider: backend of the market data (defaults to the Yahoo! Finance PriceStore)
+        :param int shard_size: maximum number of tickers held in memory at once
+        :param str join: alignment policy of the dates of the components, one of "inner", "outer" or "ffill"
+        :param WeightingEngine weighting_engine: engine mapping the growth rates to the weights (z-score if None)
+        :param GrowthCache growth_cache: cache of the growth parameters (defaults to ./growth_cache.sqlite)
+        """
+        if join not in PricePanel.JOIN_POLICIES:
+            raise ValueError(f"Unknown join policy '{join}', expected one of {', '.join(PricePanel.JOIN_POLICIES)}")
+        self.__universe = get_universe(universe)
+        self.__start_date = str(datetime.today() - timedelta(days=(int(years) * 365)))
+        self.__data_provider = data_provider or PriceStore()
+        self.__shard_size = max(1, int(shard_size))
+        self.__join = join
+        self.__dropped_tickers = dict()
+        self.__growth_rates = growth_rates if growth_rates is not None else self.__infer_growth_rates(growth_cache)
+        self.__weights = (weighting_engine or WeightingEngine()).get_weights_table(
+            {ticker: self.__growth_rates.get(ticker, np.nan) for ticker in self.__universe.get_tickers()})
+        self.__back_test_results = self.__simulate()
+
+    def __infer_growth_rates(self, growth_cache):
+        """
+        Infer the growth rates one shard at a time, reusing the cached ones
+        :param GrowthCache growth_cache: cache of the growth parameters
+        :return: a dictionary with the growth rate of each ticker
+        :rtype: dict
+        """
+        growth_cache = growth_cache or GrowthCache()
+        growth_rates = dict()
+        for shard in self.__universe.iter_shards(self.__shard_size):
+            growth_rates.update(CalculateG(shard, growth_cache=growth_cache).get_growth_rates())
+        return growth_rates
+
+    def __weight_shards(self):
+        """
+        Split the weighted tickers in shards
+        :return: a generator of lists of tickers
+        :rtype: generator
+        """
+        tickers = self.__weights.index.tolist()
+        for start in range(0, len(tickers), self.__shard_size):
+            yield tickers[start:start + self.__shard_size]
+
+    def __fetch_shard_panel(self, shard):
+        """
+        Fetch the prices of a shard
+        :param list shard: tickers of the shard
+        :return: a DataFrame with the dates as index and the tickers of the shard as columns
+        :rtype: pd.DataFrame
+        """
+        price_panel = PricePanel(self.__data_provider.get_many_prices(shard, self.__start_date), shard, self.__join)
+        self.__dropped_tickers.update(price_panel.get_dropped_tickers())
+        return price_panel.get_panel()
+
+    def __collect_dates(self):
+        """
+        Collect the dates of the whole panel, intersecting (inner) or uniting (outer, ffill) the dates of the shards
+        :return: the dates of the back-test
+        :rtype: pd.DatetimeIndex
+        """
+        dates = None
+        for shard in self.__weight_shards():
+            shard_panel = self.__fetch_shard_panel(shard)
+            if shard_panel.columns.empty:
+                continue
+            shard_dates = shard_panel.index
+            if dates is None:
+                dates = shard_dates
+            else:
+                dates = dates.intersection(shard_dates) if self.__join == "inner" else dates.union(shard_dates)
+        return dates if dates is not None else pd.DatetimeIndex([], name="Date")
+
+    def __simulate(self):
+        """
+        Multiply the partial portfolio returns of the shards, each shard aligned on the dates of the whole panel
+        :return: a DataFrame with the Portfolio and Portfolio_Dollars columns
+        :rtype: pd.DataFrame
+        """
+        dates = self.__collect_dates()
+        portfolio = np.ones(len(dates))
+        for shard in self.__weight_shards():
+            shard_panel = self.__fetch_shard_panel(shard).reindex(dates)
+            if self.__join == "ffill":
+                shard_panel = shard_panel.ffill()
+            weights = self.__weights["weights"].reindex(shard_panel.columns).to_numpy(dtype=float)
+            _, shard_portfolio, _ = ReturnsEngine.calculate(shard_panel.to_numpy(dtype=float), weights)
+            portfolio *= shard_portfolio
+        return pd.DataFrame({"Portfolio": portfolio, "Portfolio_Dollars": np.cumprod(portfolio) * 100},
+                            index=pd.Index(dates, name="Date"))
+
+    def get_back_test_results(self):
+        """
+        Get the back-test results
+        :return: a DataFrame with the Portfolio and Portfolio_Dollars columns, without the component returns
+        :rtype: pd.DataFrame
+        """
+        return self.__back_test_results
+
+    def get_weights(self):
+        """
+        Get the weights of the whole universe
+        :return: a Pandas DataFrame with the g, z-score, cdf and weights columns
+        :rtype: pd.DataFrame
+        """
+        return self.__weights
+
+    def get_growth_rates(self):
+        """
+        Get the growth rates of the universe
+        :return: a dictionary with the growth rates
+        :rtype: dict
+        """
+        return self.__growth_rates
+
+    def get_universe(self):
+        """
+        Get the universe of the back-test
+        :return: the universe with its as_of timestamp
+        :rtype: Universe
+        """
+        return self.__universe
+
+    def get_dropped_tickers(self):
+        """
+        Return the tickers left out of the price matrix
+        :return: a dictionary with the reason for each dropped ticker
+        :rtype: dict
+        """
+        return self.__dropped_tickers
@@ -4,56 +4,97 @@ import os
 import pickle
 import requests
 import string
-import time
 
-from bs4 import BeautifulSoup
+from importlib.util import find_spec
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from .concurrent_downloader import RateLimiter
+
+HTML_PARSER = "lxml" if find_spec("lxml") is not None else "html.parser"
 
 
 class GetTickers:
     """Get the tickers from DiviData.com"""
     LETTER_LIST = list(string.ascii_uppercase)
 
-    def __init__(self):
-        """Initialize the class with the given routines"""
+    def __init__(self, max_workers=4, requests_per_second=1, max_age_days=7):
+        """
+        Initialize the class with the given routines
+        :param int max_workers: number of letter pages downloaded in parallel
+        :param float requests_per_second: maximum number of requests sent to DiviData.com per second
+        :param int max_age_days: number of days after which the saved ticker list is refreshed
+        """
         self.__pickled_file_path = os.path.join(os.getcwd(), "ticker_list.pickled")
-        if os.path.exists(self.__pickled_file_path):
-            self.__extracted_data = pickle.load(open(self.__pickled_file_path, "rb"))
+        self.__max_workers = max_workers
+        self.__max_age = timedelta(days=max_age_days)
+        self.__missing_pages = dict()
+        saved_tickers = self.__load_saved_tickers()
+        if saved_tickers is not None and datetime.now() - saved_tickers["as_of"] <= self.__max_age:
+            self.__as_of, self.__extracted_data = saved_tickers["as_of"], saved_tickers["tickers"]
             return
-        self.__html_data = self.__get_raw_content()
-        self.__extracted_data = self.__get_content()
+        self.__rate_limiter = RateLimiter(requests_per_second)
+        self.__as_of = datetime.now()
+        self.__extracted_data = self.__get_content(saved_tickers["tickers"] if saved_tickers is not None else dict())
+        if not self.__missing_pages:
+            self.__save_tickers()
 
-    def __get_raw_content(self):
+    def __load_saved_tickers(self):
         """
-        Get the raw HTML data for each letter
-        :return: a dictionary of raw HTML pages
+        Load the saved ticker list, even if it is stale
+        :return: a dictionary with the as_of timestamp and the tickers, or None if missing
         :rtype: dict
         """
-        bs4_pages = list()
-        for letter in self.LETTER_LIST:
-            url = f"https://dividata.com/stocklist/{letter}"
-            page = requests.get(url)
-            print(f"Parsing url: {url}")
-            bs4_pages.append(BeautifulSoup(page.text, "html.parser"))
-            time.sleep(1)
-        return dict(zip(self.LETTER_LIST, bs4_pages))
+        if not os.path.exists(self.__pickled_file_path):
+            return None
+        with open(self.__pickled_file_path, "rb") as pickled_file:
+            saved_tickers = pickle.load(pickled_file)
+        return saved_tickers if "as_of" in saved_tickers else None
 
-    def __get_content(self):
+    def __save_tickers(self):
         """
-        Extract the content from the downloaded raw data
-        :return: a JSON with the plain tickers
-        :rtype: dict
+        Save the ticker list along with its as_of timestamp
+        :return: a saved pickled file
+        :rtype: None
         """
+        with open(self.__pickled_file_path, "wb") as pickled_file:
+            pickle.dump({"as_of": self.__as_of, "tickers": self.__extracted_data}, pickled_file)
 
-        def get_text(tag): return tag.text
+    def __get_letter_tickers(self, letter, session):
+        """
+        Download the page of a letter and extract its tickers as soon as it arrives
+        :param str letter: letter of the page
+        :param requests.Session session: HTTP session shared by the workers
+        :return: a list with the tickers of the letter, or None if the page could not be downloaded
+        :rtype: list
+        """
+        url = f"https://dividata.com/stocklist/{letter}"
+        self.__rate_limiter.acquire()
+        try:
+            page = session.get(url)
+            page.raise_for_status()
+        except requests.RequestException as error:
+            self.__missing_pages[letter] = repr(error)
+            print(f"Missing url: {url}")
+            return None
+        print(f"Parsing url: {url}")
+        columns = BeautifulSoup(page.content, HTML_PARSER, parse_only=SoupStrainer("dl", class_="dl-horizontal"))
+        return [tag.text for tag in columns.find_all("dt")]
 
-        tickers_universe = dict()
-        for letter in self.__html_data:
-            columns = self.__html_data[letter].findAll("dl", {"class": "dl-horizontal"})
-            dt_tags = [i.findAll("dt") for i in columns]
-            stock_tickers = [list(map(get_text, i)) for i in dt_tags]
-            stock_tickers_flatten = [ticker for sub_list in stock_tickers for ticker in sub_list]
-            tickers_universe[letter] = stock_tickers_flatten
-        return tickers_universe
+    def __get_content(self, saved_tickers):
+        """
+        Download and parse the pages of all the letters concurrently, keeping the saved tickers of the missing pages
+        :param dict saved_tickers: tickers of each letter saved by the previous run
+        :return: a JSON with the plain tickers
+        :rtype: dict
+        """
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            stock_tickers = executor.map(lambda letter: self.__get_letter_tickers(letter, session), self.LETTER_LIST)
+            return {letter: tickers if tickers is not None else saved_tickers.get(letter, list())
+                    for letter, tickers in zip(self.LETTER_LIST, stock_tickers)}
 
     def get_downloaded_tickers(self):
         """
@@ -62,3 +103,20 @@ class GetTickers:
         :rtype: dict
         """
         return self.__extracted_data
+
+    def get_missing_pages(self):
+        """
+        Get the letter pages which could not be downloaded, whose saved tickers (if any) are used instead; the list is
+        not saved until all the pages are downloaded
+        :return: a dictionary with the reason of the failure for each letter
+        :rtype: dict
+        """
+        return self.__missing_pages
+
+    def get_as_of(self):
+        """
+        Get the time at which the tickers were downloaded
+        :return: the as_of timestamp of the tickers
+        :rtype: datetime
+        """
+        return self.__as_of
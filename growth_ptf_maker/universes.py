@@ -0,0 +1,139 @@
+"""Define the universes of tickers the strategy can run on"""
+
+import os
+
+from datetime import datetime
+
+import pandas as pd
+
+from .refresh_tickers import GetTickers as GetDJIATickers
+from .ticker_list import GetTickers as GetDiviDataTickers
+
+
+class Universe:
+    """List of tickers with the time it was resolved, served whole or in shards"""
+
+    name = "universe"
+
+    def __init__(self, tickers, as_of):
+        """
+        Initialize the class with the given inputs
+        :param list tickers: tickers of the universe, duplicates are dropped keeping the first occurrence
+        :param datetime as_of: time at which the tickers were resolved
+        """
+        self.__tickers = list(dict.fromkeys(tickers))
+        self.__as_of = as_of
+
+    def get_tickers(self):
+        """
+        Get the tickers of the universe
+        :return: a list of tickers
+        :rtype: list
+        """
+        return self.__tickers
+
+    def get_as_of(self):
+        """
+        Get the time at which the tickers were resolved
+        :return: the as_of timestamp of the universe
+        :rtype: datetime
+        """
+        return self.__as_of
+
+    def iter_shards(self, shard_size):
+        """
+        Split the tickers in consecutive shards
+        :param int shard_size: maximum number of tickers of a shard
+        :return: a generator of lists of tickers
+        :rtype: generator
+        """
+        shard_size = max(1, int(shard_size))
+        for start in range(0, len(self.__tickers), shard_size):
+            yield self.__tickers[start:start + shard_size]
+
+
+class DJIAUniverse(Universe):
+    """Components of the Dow Jones Industrial Average, revalidated against Wikipedia"""
+
+    name = "djia"
+
+    def __init__(self, revalidate_after_hours=24):
+        """
+        Initialize the class with the given inputs
+        :param float revalidate_after_hours: hours during which the saved constituents are used without asking Wikipedia
+        """
+        djia_tickers = GetDJIATickers(revalidate_after_hours)
+        super().__init__(sorted(djia_tickers.get_tickers()), djia_tickers.get_as_of())
+
+
+class DiviDataUniverse(Universe):
+    """All the stocks listed on DiviData.com, refreshed when the saved list is stale"""
+
+    name = "dividata"
+
+    def __init__(self, max_age_days=7, max_workers=4, requests_per_second=1):
+        """
+        Initialize the class with the given inputs
+        :param int max_age_days: number of days after which the saved ticker list is refreshed
+        :param int max_workers: number of letter pages downloaded in parallel
+        :param float requests_per_second: maximum number of requests sent to DiviData.com per second
+        """
+        dividata_tickers = GetDiviDataTickers(max_workers, requests_per_second, max_age_days)
+        tickers_by_letter = dividata_tickers.get_downloaded_tickers()
+        super().__init__([ticker for letter in tickers_by_letter for ticker in tickers_by_letter[letter]],
+                         dividata_tickers.get_as_of())
+
+
+class StaticUniverse(Universe):
+    """User-supplied list of tickers"""
+
+    name = "static"
+
+    def __init__(self, tickers):
+        """
+        Initialize the class with the given inputs
+        :param list tickers: tickers of the universe
+        """
+        super().__init__(tickers, datetime.now())
+
+
+class FileUniverse(Universe):
+    """Tickers read from a text file with one ticker per line, or from the first (or "ticker") column of a CSV file"""
+
+    name = "file"
+
+    def __init__(self, file_path):
+        """
+        Initialize the class with the given inputs
+        :param str file_path: path of the file, its modification time is the as_of timestamp of the universe
+        """
+        if file_path.lower().endswith(".csv"):
+            tickers_df = pd.read_csv(file_path, dtype=str)
+            column = "ticker" if "ticker" in tickers_df.columns else tickers_df.columns[0]
+            tickers = tickers_df[column].dropna().str.strip().tolist()
+        else:
+            with open(file_path, "r") as tickers_file:
+                tickers = [line.strip() for line in tickers_file if line.strip() and not line.startswith("#")]
+        super().__init__(tickers, datetime.fromtimestamp(os.path.getmtime(file_path)))
+
+
+UNIVERSES = {"djia": DJIAUniverse, "dividata": DiviDataUniverse}
+
+
+def get_universe(universe, **kwargs):
+    """
+    Resolve a universe from a registered name, a file path, a list of tickers or a Universe
+    :param object universe: name in UNIVERSES, path of a ticker file, list of tickers or Universe object
+    :param kwargs: arguments of the registered universe, e.g. max_age_days for "dividata"
+    :return: the resolved universe
+    :rtype: Universe
+    """
+    if isinstance(universe, Universe):
+        return universe
+    if isinstance(universe, str):
+        if universe in UNIVERSES:
+            return UNIVERSES[universe](**kwargs)
+        if os.path.isfile(universe):
+            return FileUniverse(universe)
+        raise ValueError(f"Unknown universe '{universe}', expected a file or one of {', '.join(UNIVERSES)}")
+    return StaticUniverse(universe)
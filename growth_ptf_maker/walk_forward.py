@@ -0,0 +1,160 @@
+"""Back-Test the portfolio walking forward, rebalancing the weights with point-in-time growth rates"""
+
+import numpy as np
+import pandas as pd
+
+from .growth_cache import GrowthCache
+from .market_data import MarketData
+from .price_panel import PricePanel
+from .returns_engine import ReturnsEngine
+from .weighting_engine import WeightingEngine
+
+
+class WalkForwardBackTest:
+    """Walk-forward Back-Test rebalancing the portfolio on a schedule without look-ahead"""
+
+    REBALANCE_FREQUENCIES = {"monthly": "M", "quarterly": "Q"}
+
+    def __init__(self, tickers, growth_provider, start_date, end_date=None, frequency="monthly", market_data=None,
+                 growth_cache=None, join="ffill", weighting_engine=None, growth_namespace=None):
+        """
+        Initialize the class with the given inputs
+        :param list tickers: list of tickers of the universe
+        :param callable growth_provider: function (tickers, as_of) -> dict of growth rates using only data up to as_of
+        :param str start_date: start date of the back-test in a string format YYYY-MM-DD (or similar)
+        :param str end_date: end date of the back-test in a string format YYYY-MM-DD (or similar), None meaning today
+        :param str frequency: rebalance frequency, "monthly" or "quarterly"
+        :param MarketData market_data: market data shared by the session (a new session is created if None)
+        :param GrowthCache growth_cache: cache of the rebalance dates growth rates (defaults to ./growth_cache.sqlite,
+        not used without a growth namespace)
+        :param str join: alignment policy of the dates of the components, one of "inner", "outer" or "ffill"
+        :param WeightingEngine weighting_engine: engine mapping the growth rates to the weights (z-score if None)
+        :param str growth_namespace: namespace of the growth rates of the provider in the cache (derived from the
+        qualified name of growth_provider if None, the growth rates of lambdas, local functions and other callables
+        without a stable name are not cached unless a namespace is given)
+        """
+        if frequency not in self.REBALANCE_FREQUENCIES:
+            raise ValueError(f"Unknown frequency '{frequency}', expected one of "
+                             f"{', '.join(self.REBALANCE_FREQUENCIES)}")
+        self.__tickers = list(dict.fromkeys(tickers))
+        self.__growth_provider = growth_provider
+        self.__growth_namespace = growth_namespace or self.__derive_growth_namespace(growth_provider)
+        self.__frequency = frequency
+        self.__market_data = market_data or MarketData(start_date, end_date)
+        self.__growth_cache = growth_cache or (GrowthCache() if self.__growth_namespace is not None else None)
+        self.__weighting_engine = weighting_engine or WeightingEngine()
+        self.__market_data.load(self.__tickers)
+        price_panel = PricePanel({i: self.__market_data.get_prices(i, start_date, end_date) for i in self.__tickers},
+                                 join=join)
+        self.__prices = price_panel.get_panel()
+        self.__dropped_tickers = price_panel.get_dropped_tickers()
+        self.__rebalance_positions = self.__find_rebalance_positions()
+        self.__weights_history = self.__calculate_weights_history()
+        self.__back_test_results = self.__simulate()
+
+    @staticmethod
+    def __derive_growth_namespace(growth_provider):
+        """
+        Derive the namespace of the growth rates of a provider in the cache from its qualified name
+        :param callable growth_provider: function (tickers, as_of) -> dict of growth rates
+        :return: the namespace of the provider, or None if it has no stable name across runs
+        :rtype: str
+        """
+        name = getattr(growth_provider, "__qualname__", None)
+        module = getattr(growth_provider, "__module__", None)
+        if name is None or module is None or "<" in name:
+            return None
+        return f"walk_forward:{module}.{name}"
+
+    def __find_rebalance_positions(self):
+        """
+        Find the first trading day of each rebalance period
+        :return: the positions of the rebalance dates in the price index
+        :rtype: np.ndarray
+        """
+        periods = self.__prices.index.to_period(self.REBALANCE_FREQUENCIES[self.__frequency]).asi8
+        return np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]]) if len(periods) else np.array([], dtype=int)
+
+    def __get_growth_rates(self, tickers, as_of):
+        """
+        Get the growth rates as of the rebalance date, reusing the cached ones if the provider has a namespace
+        :param list tickers: tickers priced on the rebalance date
+        :param pd.Timestamp as_of: rebalance date
+        :return: a dictionary with the growth rate of each ticker
+        :rtype: dict
+        """
+        if self.__growth_namespace is None:
+            return dict(self.__growth_provider(tickers, as_of))
+        growth_rates = self.__growth_cache.get_growth_rates_as_of(tickers, as_of.date(), self.__growth_namespace)
+        missing_tickers = [ticker for ticker in tickers if ticker not in growth_rates]
+        if missing_tickers:
+            provided_rates = self.__growth_provider(missing_tickers, as_of)
+            self.__growth_cache.save_growth_rates(provided_rates, as_of.date(), self.__growth_namespace)
+            growth_rates.update(provided_rates)
+        return growth_rates
+
+    def __calculate_weights_history(self):
+        """
+        Calculate the weights on each rebalance date using only the tickers priced on that date, all the dates at once
+        :return: a DataFrame with the rebalance dates as index and the tickers as columns
+        :rtype: pd.DataFrame
+        """
+        prices = self.__prices.to_numpy(dtype=float)
+        growth_history = pd.DataFrame(np.nan, index=self.__prices.index[self.__rebalance_positions],
+                                      columns=self.__prices.columns)
+        for row, position in enumerate(self.__rebalance_positions):
+            priced_tickers = self.__prices.columns[~np.isnan(prices[position])].tolist()
+            growth_rates = self.__get_growth_rates(priced_tickers, self.__prices.index[position])
+            growth_history.iloc[row] = pd.Series(growth_rates, dtype=float).reindex(self.__prices.columns)
+        return self.__weighting_engine.get_weights(growth_history).fillna(0)
+
+    def __simulate(self):
+        """
+        Simulate the portfolio over the whole date x ticker matrix, letting the holdings drift between rebalances:
+        as the portfolio return is the product of the weighted component returns, each component is a sleeve holding
+        its target weight in the stock on the rebalance date, whose weight then moves with the price of the stock
+        :return: a DataFrame with the weighted returns and the Portfolio and Portfolio_Dollars columns
+        :rtype: pd.DataFrame
+        """
+        dates_count = len(self.__prices.index)
+        effective_positions = self.__rebalance_positions + 1
+        in_range = effective_positions < dates_count
+        last_rebalance = np.full(dates_count, -1)
+        last_rebalance[effective_positions[in_range]] = np.flatnonzero(in_range)
+        last_rebalance = np.maximum.accumulate(last_rebalance)
+        prices = self.__prices.to_numpy(dtype=float)
+        weights_matrix = np.zeros((dates_count, self.__prices.shape[1]))
+        held = np.flatnonzero(last_rebalance >= 0)
+        target_weights = self.__weights_history.to_numpy()[last_rebalance[held]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = prices[held - 1] / prices[self.__rebalance_positions[last_rebalance[held]]]
+            sleeve_values = 1 + target_weights * (growth - 1)
+            weights_matrix[held] = np.where(sleeve_values > 0, target_weights * growth / sleeve_values, 0)
+        weighted_returns, portfolio, portfolio_dollars = ReturnsEngine.calculate(prices, weights_matrix)
+        data = np.column_stack([weighted_returns, portfolio, portfolio_dollars])
+        columns = self.__prices.columns.tolist() + ["Portfolio", "Portfolio_Dollars"]
+        return pd.DataFrame(data, index=self.__prices.index, columns=columns)
+
+    def get_back_test_results(self):
+        """
+        Get the walk-forward back-test results
+        :return: a Pandas DataFrame with the same layout as BackTest.get_back_test_results
+        :rtype: pd.DataFrame
+        """
+        return self.__back_test_results
+
+    def get_weights_history(self):
+        """
+        Get the weights set on each rebalance date, applied from the following trading day
+        :return: a DataFrame with the rebalance dates as index and the tickers as columns
+        :rtype: pd.DataFrame
+        """
+        return self.__weights_history
+
+    def get_dropped_tickers(self):
+        """
+        Return the tickers left out of the price matrix
+        :return: a dictionary with the reason for each dropped ticker
+        :rtype: dict
+        """
+        return self.__dropped_tickers
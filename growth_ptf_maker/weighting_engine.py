@@ -0,0 +1,146 @@
+"""Map the growth rates of many cross-sections to the weights of Zero-Investment Portfolios at once"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from scipy.stats import norm, rankdata
+
+
+class WeightingEngine:
+    """Standardize growth rates row by row over a 2-D cross-section x ticker array and map them to weights"""
+
+    METHODS = ("zscore", "winsorized", "rank", "sector_neutral")
+
+    def __init__(self, method="zscore", winsorize_limits=(0.05, 0.95), sectors=None):
+        """
+        Initialize the class with the given inputs
+        :param str method: "zscore" (norm.cdf of the z-score minus 0.5), "winsorized" (z-score of the growth rates
+        clipped at the quantiles of their cross-section), "rank" (percentile rank minus 0.5) or "sector_neutral"
+        (z-score within each sector)
+        :param tuple winsorize_limits: lower and upper quantiles at which the growth rates are clipped by "winsorized"
+        :param dict sectors: sector of each ticker, required by "sector_neutral" (the tickers without a sector are
+        standardized together)
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown weighting method '{method}', expected one of {', '.join(self.METHODS)}")
+        if method == "sector_neutral" and sectors is None:
+            raise ValueError("The sector_neutral weighting method requires the sectors of the tickers")
+        self.__method = method
+        self.__winsorize_limits = winsorize_limits
+        self.__sectors = sectors or dict()
+
+    def __segment_codes(self, tickers):
+        """
+        Encode the segment of each ticker, one segment per sector for "sector_neutral" and a single one otherwise
+        :param list tickers: tickers of the columns
+        :return: an array with the segment code of each column
+        :rtype: np.ndarray
+        """
+        if self.__method != "sector_neutral":
+            return np.zeros(len(tickers), dtype=int)
+        codes, _ = pd.factorize(pd.Series([self.__sectors.get(ticker) for ticker in tickers], dtype=object))
+        return np.where(codes < 0, codes.max(initial=-1) + 1, codes)
+
+    @staticmethod
+    def __segment_zscores(growth_matrix, segment_codes):
+        """
+        Standardize each row within each segment of columns with reduceat on the columns sorted by segment
+        :param np.ndarray growth_matrix: growth rates with a row per cross-section, NaN for the tickers out of it
+        :param np.ndarray segment_codes: segment code of each column
+        :return: the z-scores, NaN where the growth is missing or the segment has less than two growth rates
+        :rtype: np.ndarray
+        """
+        order = np.argsort(segment_codes, kind="stable")
+        sorted_codes = segment_codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        lengths = np.diff(np.r_[starts, len(sorted_codes)])
+        values = growth_matrix[:, order]
+        present = ~np.isnan(values)
+        counts = np.add.reduceat(present, starts, axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.add.reduceat(np.where(present, values, 0), starts, axis=1) / counts
+            deviations = values - np.repeat(means, lengths, axis=1)
+            variances = np.add.reduceat(np.where(present, deviations ** 2, 0), starts, axis=1) / (counts - 1)
+            stds = np.where(counts > 1, np.sqrt(variances), np.nan)
+            sorted_scores = deviations / np.repeat(stds, lengths, axis=1)
+        scores = np.empty_like(sorted_scores)
+        scores[:, order] = sorted_scores
+        return scores
+
+    def __winsorize(self, growth_matrix):
+        """
+        Clip each row at the quantiles of its own growth rates
+        :param np.ndarray growth_matrix: growth rates with a row per cross-section
+        :return: the clipped growth rates
+        :rtype: np.ndarray
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            lower, upper = np.nanquantile(growth_matrix, self.__winsorize_limits, axis=1)
+        return np.clip(growth_matrix, lower[:, None], upper[:, None])
+
+    @staticmethod
+    def __percentile_ranks(growth_matrix):
+        """
+        Rank each row, averaging the ties, and map the ranks to the middle of their percentile bucket
+        :param np.ndarray growth_matrix: growth rates with a row per cross-section
+        :return: the percentile ranks in (0, 1), NaN where the growth is missing
+        :rtype: np.ndarray
+        """
+        present = ~np.isnan(growth_matrix)
+        ranks = rankdata(np.where(present, growth_matrix, np.inf), method="average", axis=1)
+        counts = present.sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(present, (ranks - 0.5) / counts, np.nan)
+
+    def calculate(self, growth_matrix, tickers):
+        """
+        Calculate the scores and the cumulative probabilities of all the cross-sections in one pass
+        :param np.ndarray growth_matrix: growth rates with a row per cross-section and a column per ticker, NaN for the
+        tickers out of the cross-section
+        :param list tickers: tickers of the columns
+        :return: a tuple with the scores (z-scores, or normal scores of the ranks) and the cumulative probabilities
+        :rtype: tuple
+        """
+        growth_matrix = np.atleast_2d(np.asarray(growth_matrix, dtype=float))
+        if growth_matrix.size == 0:
+            return growth_matrix.copy(), growth_matrix.copy()
+        if self.__method == "rank":
+            cdf = self.__percentile_ranks(growth_matrix)
+            return norm.ppf(cdf), cdf
+        if self.__method == "winsorized":
+            growth_matrix = self.__winsorize(growth_matrix)
+        scores = self.__segment_zscores(growth_matrix, self.__segment_codes(tickers))
+        return scores, norm.cdf(scores)
+
+    def get_weights(self, growth_rates):
+        """
+        Calculate the weights of one or many cross-sections
+        :param pd.DataFrame growth_rates: growth rates with a row per cross-section (e.g. a date or a universe) and a
+        column per ticker, NaN for the tickers out of the cross-section, or a Series / dictionary for a single one
+        :return: the weights, cdf minus 0.5, in the same shape as the growth rates
+        :rtype: pd.DataFrame
+        """
+        if isinstance(growth_rates, pd.DataFrame):
+            _, cdf = self.calculate(growth_rates.to_numpy(dtype=float), growth_rates.columns.tolist())
+            return pd.DataFrame(cdf - 0.5, index=growth_rates.index, columns=growth_rates.columns)
+        growth_rates = pd.Series(growth_rates, dtype=float)
+        _, cdf = self.calculate(growth_rates.to_numpy()[None, :], growth_rates.index.tolist())
+        return pd.Series(cdf[0] - 0.5, index=growth_rates.index, name="weights")
+
+    def get_weights_table(self, growth_rates):
+        """
+        Calculate the weights of a single cross-section along with the intermediate steps
+        :param dict growth_rates: dictionary with the growth rate of each ticker
+        :return: a Pandas DataFrame with the g, z-score, cdf and weights columns for the tickers with a growth rate
+        :rtype: pd.DataFrame
+        """
+        growth_df = pd.DataFrame(index=list(growth_rates.keys()), data={"g": list(growth_rates.values())})
+        growth_df.dropna(inplace=True)
+        scores, cdf = self.calculate(growth_df["g"].to_numpy(dtype=float)[None, :], growth_df.index.tolist())
+        growth_df["z-score"] = scores[0]
+        growth_df["cdf"] = cdf[0]
+        growth_df["weights"] = growth_df["cdf"] - 0.5
+        return growth_df
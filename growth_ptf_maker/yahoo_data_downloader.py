@@ -1,28 +1,85 @@
 """Module to download data from Yahoo! Finance"""
 
+import time
+
 import dateparser
 import requests
 
 from datetime import datetime
-from io import BytesIO
+from io import BufferedReader, BytesIO, RawIOBase
 
 import pandas as pd
 
+from .instrumentation import NULL_METRICS
+
+
+class _ResponseReader(RawIOBase):
+    """Read-only file over the body of a streamed response, raising the transport errors as requests exceptions"""
+
+    def __init__(self, response, chunk_size=65536):
+        """
+        Initialize the class with the given inputs
+        :param requests.models.Response response: streamed response to read the body of
+        :param int chunk_size: bytes requested from the connection at once
+        """
+        self.__chunks = response.iter_content(chunk_size)
+        self.__pending = b""
+
+    def readable(self):
+        """
+        Tell that the body can be read
+        :return: True
+        :rtype: bool
+        """
+        return True
+
+    def readinto(self, buffer):
+        """
+        Fill the buffer with the next bytes of the body
+        :param memoryview buffer: buffer to fill
+        :return: the number of bytes read, 0 at the end of the body
+        :rtype: int
+        """
+        if not self.__pending:
+            self.__pending = next(self.__chunks, b"")
+        size = min(len(buffer), len(self.__pending))
+        buffer[:size] = self.__pending[:size]
+        self.__pending = self.__pending[size:]
+        return size
+
 
 class YahooFinanceDownloader:
     """Download data from Yahoo! Finance from the start_date to the end_date"""
 
-    def __init__(self, ticker, start_date, end_date=None):
+    COLUMNS = ("Date", "Open", "High", "Low", "Close", "Adj Close", "Volume")
+    PRICE_COLUMNS = ("Date", "Adj Close")
+    DEFAULT_TIMEOUT = 30
+
+    def __init__(self, ticker, start_date, end_date=None, session=None, metrics=None, columns=None, price_dtype=None,
+                 stream=False, timeout=DEFAULT_TIMEOUT):
         """
         Initialize the class with the given input
         :param str ticker: single ticker or list of tickers to use to download the data from Yahoo! Finance
         :param str start_date: start date of the query period in a string format YYYY-MM-DD (or similar)
         :param str end_date: end date of the query period in a string format YYYY-MM-DD (or similar)
+        :param requests.Session session: keep-alive HTTP session to use for the query (a new connection if None)
+        :param Metrics metrics: metrics recording the latency and the size of the request (not recorded if None)
+        :param tuple columns: columns to parse, with the Date parsed to datetime64, e.g. PRICE_COLUMNS (all the columns
+        with the Date left as text if None)
+        :param str price_dtype: dtype of the parsed price and volume columns, e.g. "float32" (inferred if None)
+        :param bool stream: parse the body while it is received instead of buffering it (the raw results are not kept)
+        :param float timeout: seconds to wait for the connection and for each read before raising requests.Timeout
         """
 
         self.__ticker = ticker
         self.__start_date = start_date
         self.__end_date = end_date
+        self.__session = session
+        self.__metrics = metrics or NULL_METRICS
+        self.__columns = list(columns) if columns is not None else None
+        self.__price_dtype = price_dtype
+        self.__stream = stream
+        self.__timeout = timeout
         self.__validate_inputs()
         self.__raw_query_results = self.__download_file()
         self.__parsed_results = self.__parse_results()
@@ -48,23 +105,63 @@ class YahooFinanceDownloader:
         self.__url = f"https://query1.finance.yahoo.com/v7/finance/download/{self.__ticker}?period1=" \
                      f"{period1}&period2={period2}&interval=1d&events=history&" \
                      f"includeAdjustedClose=true"
-        return requests.get(self.__url)
+        start_time = time.perf_counter()
+        response = (self.__session or requests).get(self.__url, stream=self.__stream, timeout=self.__timeout)
+        self.__latency = time.perf_counter() - start_time
+        if not self.__stream or response.status_code >= 400:
+            self.__record_request(response, len(response.content))
+        response.raise_for_status()
+        return response
+
+    def __record_request(self, response, size):
+        """
+        Record the latency and the size of the request in the metrics
+        :param requests.models.Response response: response of the request
+        :param int size: bytes received
+        :return: None
+        :rtype: None
+        """
+        self.__metrics.record_request(self.__url, self.__latency, size, response.status_code)
 
     def get_raw_results(self):
         """
         Get the downloaded raw results"
-        :return: a string text with the results
+        :return: a string text with the results, or None if the body was streamed
         :rtype: str
         """
-        return self.__raw_query_results.text
+        return None if self.__stream else self.__raw_query_results.text
 
     def __parse_results(self):
         """
-        Parse results in a Pandas DF
+        Parse results in a Pandas DF, straight from the connection when the body is streamed, so that a body cut off
+        mid-read raises a requests.RequestException like a buffered one
+        :return: a DataFrame with the parsed results
+        :rtype: pd.DataFrame
+        """
+        if not self.__stream:
+            return self.__read_csv(BytesIO(self.__raw_query_results.content))
+        try:
+            return self.__read_csv(BufferedReader(_ResponseReader(self.__raw_query_results)))
+        finally:
+            self.__record_request(self.__raw_query_results, self.__raw_query_results.raw.tell())
+            self.__raw_query_results.close()
+
+    def __read_csv(self, source):
+        """
+        Read the CSV with the requested columns and dtypes
+        :param file source: file-like object with the CSV
         :return: a DataFrame with the parsed results
         :rtype: pd.DataFrame
         """
-        return pd.read_csv(BytesIO(self.__download_file().content))
+        columns = self.__columns or self.COLUMNS
+        options = dict()
+        if self.__columns is not None:
+            options["usecols"] = self.__columns
+            if "Date" in self.__columns:
+                options["parse_dates"] = ["Date"]
+        if self.__price_dtype is not None:
+            options["dtype"] = {column: self.__price_dtype for column in columns if column != "Date"}
+        return pd.read_csv(source, **options)
 
     def get_parsed_results(self):
         """
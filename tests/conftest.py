@@ -0,0 +1,104 @@
+"""Fixtures shared by the tests, serving Yahoo! Finance downloads from memory"""
+
+import io
+
+from datetime import datetime
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+import urllib3
+
+
+def make_prices(dates, seed=0, initial_price=100.0):
+    """
+    Build a random walk of prices on the given dates
+    :param pd.DatetimeIndex dates: dates of the prices
+    :param int seed: seed of the random walk
+    :param float initial_price: first price of the walk
+    :return: a DataFrame with the Date and Adj Close columns
+    :rtype: pd.DataFrame
+    """
+    returns = np.random.default_rng(seed).normal(0, 0.01, len(dates))
+    return pd.DataFrame({"Date": pd.DatetimeIndex(dates), "Adj Close": initial_price * np.exp(np.cumsum(returns))})
+
+
+class FakeYahooFinance:
+    """Answer the Yahoo! Finance download URLs with the CSV of in-memory price histories"""
+
+    def __init__(self):
+        """
+        Initialize the class with no histories
+        """
+        self.prices = dict()
+        self.failures = dict()
+        self.requests = list()
+        self.timeouts = list()
+
+    def get(self, url, stream=False, **kwargs):
+        """
+        Answer a download request, failing it first with the responses queued in failures for the ticker
+        :param str url: Yahoo! Finance download URL
+        :param bool stream: unused, the body is always read from the connection
+        :return: the response, with a body cut off mid-read for a queued "truncated" failure
+        :rtype: requests.models.Response
+        :raises requests.Timeout: for a queued "timeout" failure
+        """
+        parsed_url = urlparse(url)
+        ticker = parsed_url.path.rsplit("/", 1)[-1]
+        query = parse_qs(parsed_url.query)
+        start_date = pd.Timestamp(datetime.fromtimestamp(int(query["period1"][0]))).normalize()
+        end_date = pd.Timestamp(datetime.fromtimestamp(int(query["period2"][0])))
+        self.requests.append((ticker, start_date, end_date))
+        self.timeouts.append(kwargs.get("timeout"))
+        failure = self.failures[ticker].pop(0) if self.failures.get(ticker) else None
+        if failure == "timeout":
+            raise requests.ConnectTimeout(f"Connection to {parsed_url.netloc} timed out")
+        if isinstance(failure, int):
+            return self.__respond(url, b"", failure)
+        prices = self.prices[ticker]
+        in_range = (prices["Date"] >= start_date) & (prices["Date"] <= end_date)
+        body = prices.loc[in_range].to_csv(index=False, date_format="%Y-%m-%d").encode()
+        if failure == "truncated":
+            return self.__respond(url, body[:len(body) // 2], 200, len(body))
+        return self.__respond(url, body, 200)
+
+    @staticmethod
+    def __respond(url, body, status_code, content_length=None):
+        """
+        Build a response reading the body from a connection announcing content_length bytes
+        :param str url: requested URL
+        :param bytes body: bytes sent before the connection is closed
+        :param int status_code: HTTP status code
+        :param int content_length: announced length of the body (the length of the body if None)
+        :return: the response
+        :rtype: requests.models.Response
+        """
+        response = requests.Response()
+        response.url = url
+        response.status_code = status_code
+        response.raw = urllib3.HTTPResponse(body=io.BytesIO(body), status=status_code, preload_content=False,
+                                            headers={"content-length": str(content_length or len(body))})
+        return response
+
+
+@pytest.fixture(autouse=True)
+def working_directory(tmp_path, monkeypatch):
+    """
+    Run every test in its own folder, as the stores and caches default to the working directory
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    """
+    Route the Yahoo! Finance downloads to a FakeYahooFinance
+    """
+    server = FakeYahooFinance()
+    monkeypatch.setattr(requests, "get", server.get)
+    monkeypatch.setattr(requests.Session, "get", lambda session, url, **kwargs: server.get(url, **kwargs))
+    return server
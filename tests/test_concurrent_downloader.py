@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from growth_ptf_maker.concurrent_downloader import ConcurrentDownloader, RateLimiter
+from growth_ptf_maker.instrumentation import Metrics
+
+from conftest import make_prices
+
+
+@pytest.fixture
+def tickers(yahoo):
+    for seed, ticker in enumerate(["AAA", "BBB", "CCC"]):
+        yahoo.prices[ticker] = make_prices(pd.bdate_range("2021-01-04", "2021-03-31"), seed=seed)
+    return ["AAA", "BBB", "CCC"]
+
+
+def download(tickers, metrics=None, **kwargs):
+    return ConcurrentDownloader(tickers, "2021-01-01", "2021-04-01", max_workers=2, requests_per_second=1000,
+                                backoff=0, metrics=metrics, **kwargs)
+
+
+def test_all_tickers_are_downloaded_once(yahoo, tickers):
+    downloader = download(tickers)
+    assert sorted(downloader.get_parsed_results()) == tickers
+    assert sorted(request[0] for request in yahoo.requests) == tickers
+
+
+def test_transient_errors_are_retried(yahoo, tickers):
+    yahoo.failures["AAA"] = [503, 429]
+    metrics = Metrics()
+    downloader = download(tickers, metrics)
+    assert downloader.get_failures() == {}
+    assert len(downloader.get_parsed_results()["AAA"]) == len(yahoo.prices["AAA"])
+    assert metrics.get_results()["counters"]["download_retries"] == 2
+
+
+def test_permanent_errors_are_not_retried(yahoo, tickers):
+    yahoo.failures["BBB"] = [404]
+    metrics = Metrics()
+    downloader = download(tickers, metrics)
+    assert list(downloader.get_failures()) == ["BBB"]
+    assert sorted(downloader.get_parsed_results()) == ["AAA", "CCC"]
+    assert [request[0] for request in yahoo.requests].count("BBB") == 1
+    assert "BBB" in metrics.get_results()["failed_tickers"]["download"]
+
+
+def test_failure_is_recorded_when_the_retries_are_exhausted(yahoo, tickers):
+    yahoo.failures["CCC"] = [500, 500, 500]
+    downloader = download(tickers, retries=2)
+    assert list(downloader.get_failures()) == ["CCC"]
+    assert [request[0] for request in yahoo.requests].count("CCC") == 3
+
+
+def test_timeouts_are_set_and_retried(yahoo, tickers):
+    yahoo.failures["AAA"] = ["timeout"]
+    metrics = Metrics()
+    downloader = download(tickers, metrics, timeout=5)
+    assert downloader.get_failures() == {}
+    assert len(downloader.get_parsed_results()["AAA"]) == len(yahoo.prices["AAA"])
+    assert [request[0] for request in yahoo.requests].count("AAA") == 2
+    assert set(yahoo.timeouts) == {5}
+    assert metrics.get_results()["counters"]["download_retries"] == 1
+
+
+def test_rate_limiter_spaces_the_requests(monkeypatch):
+    clock = {"now": 0.0, "sleeps": []}
+
+    def sleep(seconds):
+        clock["sleeps"].append(seconds)
+        clock["now"] += seconds
+
+    monkeypatch.setattr("growth_ptf_maker.concurrent_downloader.time.monotonic", lambda: clock["now"])
+    monkeypatch.setattr("growth_ptf_maker.concurrent_downloader.time.sleep", sleep)
+    rate_limiter = RateLimiter(10, burst=2)
+    for _ in range(5):
+        rate_limiter.acquire()
+    assert len(clock["sleeps"]) == 3
+    assert clock["now"] == pytest.approx(0.3)
@@ -0,0 +1,98 @@
+import os
+
+import pandas as pd
+import pytest
+
+from growth_ptf_maker import data_providers
+from growth_ptf_maker.component_weights import GrowthAndWeights
+from growth_ptf_maker.data_providers import DataProvider, SyntheticDataProvider
+from growth_ptf_maker.portfolio_dashboard import PortfolioDashboard
+from growth_ptf_maker.results_store import ResultsStore
+
+
+def test_data_provider_is_abstract():
+    with pytest.raises(TypeError):
+        DataProvider()
+
+    class NoPrices(DataProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        NoPrices()
+
+
+def test_only_absolute_dates_are_cached(monkeypatch):
+    parsed_dates = list()
+    parse = data_providers.dateparser.parse
+
+    def counting_parse(date, **kwargs):
+        parsed_dates.append(date)
+        return parse(date, **kwargs)
+
+    monkeypatch.setattr(data_providers.dateparser, "parse", counting_parse)
+    DataProvider._DataProvider__parse_absolute_date.cache_clear()
+    for _ in range(2):
+        assert DataProvider.parse_date("2021-01-04") == pd.Timestamp("2021-01-04")
+        assert DataProvider.parse_date("1 year ago") == pd.Timestamp.today().normalize() - pd.DateOffset(years=1)
+
+    assert parsed_dates.count("2021-01-04") == len(data_providers.RELATIVE_BASES)
+    assert parsed_dates.count("1 year ago") == len(data_providers.RELATIVE_BASES) + 2
+
+
+def test_offline_dashboard_ignores_the_working_directory_results(tmp_path):
+    provider = SyntheticDataProvider(seed=3)
+    tickers = provider.get_tickers(5)
+    growth_rates = provider.get_growth_rates(tickers)
+    stale_weights = pd.DataFrame(index=tickers, data={"weights": [1.0, 0.0, 0.0, 0.0, 0.0]})
+    ResultsStore().save(ResultsStore.WEIGHTS, stale_weights)
+    stale_weights.to_csv(ResultsStore.LEGACY_WEIGHTS_FILE)
+    stored_files = sorted(os.listdir(tmp_path / "results_store" / ResultsStore.WEIGHTS))
+
+    results = PortfolioDashboard(data_provider=provider, tickers=tickers, growth_rates=growth_rates,
+                                 benchmarks=()).back_test_results()
+
+    pd.testing.assert_frame_equal(results["weights"], GrowthAndWeights.calculate_weights(growth_rates))
+    assert sorted(os.listdir(tmp_path / "results_store" / ResultsStore.WEIGHTS)) == stored_files
+    assert not os.path.isdir(tmp_path / "results_store" / ResultsStore.GROWTH_RATES)
+
+
+def test_offline_dashboard_saves_to_an_explicit_results_store(tmp_path):
+    provider = SyntheticDataProvider(seed=3)
+    tickers = provider.get_tickers(5)
+    store_path = str(tmp_path / "explicit")
+
+    PortfolioDashboard(data_provider=provider, tickers=tickers, growth_rates=provider.get_growth_rates(tickers),
+                       results_store_path=store_path, benchmarks=()).back_test_results()
+
+    store = ResultsStore(store_path)
+    assert store.has(ResultsStore.WEIGHTS) and store.has(ResultsStore.BACK_TEST)
+    assert not os.path.isdir(tmp_path / "results_store")
+
+
+def test_synthetic_windows_slice_the_same_path():
+    provider = SyntheticDataProvider(seed=9, path_cache_size=1)
+    full_path = provider.get_prices("AAA", "2020-01-01", "2021-12-31").set_index("Date")["Adj Close"]
+    future_end = pd.Timestamp.today().normalize() + pd.Timedelta(days=30)
+
+    window = provider.get_prices("AAA", "2021-03-01", "2021-03-31")
+    provider.get_prices("BBB", "2021-03-01", "2021-03-31")
+    future = provider.get_prices("AAA", "2020-01-01", str(future_end))
+
+    pd.testing.assert_series_equal(window.set_index("Date")["Adj Close"], full_path.loc["2021-03-01":"2021-03-31"])
+    pd.testing.assert_series_equal(future.set_index("Date")["Adj Close"].loc[:"2021-12-31"], full_path)
+    assert future["Date"].iloc[-1] == pd.bdate_range(end=future_end, periods=1)[0]
+    assert provider.get_prices("AAA", "2021-02-01", "2021-01-01").empty
+
+
+def test_synthetic_calendar_is_built_once_for_a_weekend_end(monkeypatch):
+    provider = SyntheticDataProvider()
+    provider.get_prices("AAA", "2030-01-01", "2030-01-06")
+    calendars = list()
+    bdate_range = pd.bdate_range
+    monkeypatch.setattr(data_providers.pd, "bdate_range", lambda *args: calendars.append(args) or bdate_range(*args))
+
+    for ticker in ["AAA", "BBB"]:
+        prices = provider.get_prices(ticker, "2030-01-01", "2030-01-06")
+
+    assert calendars == []
+    assert prices["Date"].iloc[-1] == pd.Timestamp("2030-01-04")
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import pandas as pd
+
+from growth_ptf_maker.backtest import BackTest
+from growth_ptf_maker.market_data import MarketData
+from growth_ptf_maker.price_store import PriceStore
+
+from conftest import make_prices
+
+TODAY = pd.Timestamp(datetime.today()).normalize()
+
+
+def test_failed_ticker_is_dropped_from_the_back_test(yahoo, tmp_path):
+    dates = pd.bdate_range(TODAY - pd.Timedelta(days=400), TODAY - pd.Timedelta(days=1))
+    for seed, ticker in enumerate(["AAA", "BBB"]):
+        yahoo.prices[ticker] = make_prices(dates, seed=seed)
+    yahoo.failures["DELISTED"] = [404] * 10
+    store = PriceStore(str(tmp_path / "price_store"), requests_per_second=1000)
+    market_data = MarketData(str(TODAY - pd.Timedelta(days=400)), data_provider=store)
+    weights = pd.DataFrame(index=["AAA", "BBB", "DELISTED"], data={"weights": [0.2, -0.1, 0.3]})
+
+    back_test = BackTest(weights.index.tolist(), weights, 1, market_data)
+
+    assert back_test.get_dropped_tickers() == {"DELISTED": "no data"}
+    assert list(back_test.get_back_test_results().columns) == ["AAA", "BBB", "Portfolio", "Portfolio_Dollars"]
+    assert "404" in market_data.get_failures()["DELISTED"]
+    assert [request[0] for request in yahoo.requests].count("DELISTED") == 1
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scipy.stats import norm
+
+from growth_ptf_maker.data_providers import SyntheticDataProvider
+from growth_ptf_maker.monte_carlo import MonteCarloRiskMetrics
+from growth_ptf_maker.returns_engine import ReturnsEngine
+
+
+class FakeBackTest:
+
+    def __init__(self, results):
+        self.__results = results
+
+    def get_back_test_results(self):
+        return self.__results
+
+
+@pytest.fixture
+def back_test():
+    provider = SyntheticDataProvider(seed=11)
+    tickers = provider.get_tickers(4)
+    histories = provider.get_many_prices(tickers, "2020-01-01", "2020-12-31")
+    prices = pd.DataFrame({ticker: history.set_index("Date")["Adj Close"] for ticker, history in histories.items()})
+    weights = pd.Series([0.3, -0.2, 0.1, 0.4], index=tickers)
+    return FakeBackTest(ReturnsEngine(prices, weights).get_results())
+
+
+@pytest.mark.parametrize("method", ["normal", "bootstrap"])
+def test_results_do_not_depend_on_the_workers(back_test, method):
+    simulations = [MonteCarloRiskMetrics(back_test, method, paths=4000, horizons=(1, 5), chunk_size=1000,
+                                         max_workers=max_workers, seed=3) for max_workers in (1, 2)]
+
+    pd.testing.assert_frame_equal(simulations[0].get_results(), simulations[1].get_results())
+    pd.testing.assert_frame_equal(simulations[0].get_simulated_returns(), simulations[1].get_simulated_returns())
+
+
+def test_bootstrap_does_not_resample_the_first_day(back_test):
+    history = back_test.get_back_test_results()["Portfolio"].to_numpy()[1:] - 1
+
+    simulated_returns = MonteCarloRiskMetrics(back_test, "bootstrap", paths=5000, horizons=(1,)).get_simulated_returns()
+
+    assert np.isin(simulated_returns[1].to_numpy(), history).all()
+    assert not (simulated_returns[1] == 0).any()
+
+
+def test_normal_measures_match_the_gaussian(back_test):
+    results = back_test.get_back_test_results()
+    portfolio_returns = np.nansum(results.drop(columns=["Portfolio", "Portfolio_Dollars"]).to_numpy() - 1, axis=1)[1:]
+    mean, std = portfolio_returns.mean(), portfolio_returns.std(ddof=1)
+
+    measures = MonteCarloRiskMetrics(back_test, "normal", paths=200000, horizons=(1,), seed=1).get_results()
+
+    assert measures.loc[(1, 99), "var"] == pytest.approx(-(mean + std * norm.ppf(0.01)), rel=0.02)
+    assert measures.loc[(1, 97.5), "es"] == pytest.approx(-(mean - std * norm.pdf(norm.ppf(0.025)) / 0.025),
+                                                          rel=0.02)
+    assert (measures["es"] >= measures["var"]).all()
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from growth_ptf_maker.data_providers import SyntheticDataProvider
+from growth_ptf_maker import parameter_sweep
+from growth_ptf_maker.parameter_sweep import ParameterSweep
+from growth_ptf_maker.returns_engine import ReturnsEngine
+from growth_ptf_maker.weighting_engine import WeightingEngine
+
+
+def failing_transform(growth_rates):
+    raise ZeroDivisionError("broken transform")
+
+
+@pytest.fixture
+def market():
+    provider = SyntheticDataProvider(seed=7)
+    tickers = provider.get_tickers(8)
+    histories = provider.get_many_prices(tickers, "2019-01-01", "2021-12-31")
+    prices = pd.DataFrame({ticker: history.set_index("Date")["Adj Close"] for ticker, history in histories.items()})
+    return prices, provider.get_growth_rates(tickers)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_variants_match_a_direct_back_test(market, max_workers):
+    prices, growth_rates = market
+    universe = prices.columns[:5].tolist()
+    variants = [{"name": "all"}, {"name": "one_year", "years": 1}, {"name": "rank", "transform": "rank"},
+                {"name": "subset", "universe": universe}]
+    results = ParameterSweep(prices, growth_rates, max_workers=max_workers).run(variants).set_index("name")
+    weights = WeightingEngine().get_weights(pd.Series(growth_rates))
+    _, _, dollars = ReturnsEngine.calculate(prices.to_numpy(), weights.reindex(prices.columns).to_numpy())
+    assert results.loc["all", "total_return"] == pytest.approx(dollars[-1] / 100 - 1, rel=1e-12)
+    subset_weights = WeightingEngine().get_weights(pd.Series(growth_rates)[universe]).to_numpy()
+    _, _, dollars = ReturnsEngine.calculate(prices[universe].to_numpy(), subset_weights)
+    assert results.loc["subset", "total_return"] == pytest.approx(dollars[-1] / 100 - 1, rel=1e-12)
+    assert results.loc["subset", "components"] == 5
+    assert results.loc["one_year", "start_date"] >= np.datetime64("2020-12-31")
+    assert results.loc["rank", "transform"] == "rank"
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_variant_errors_are_raised_unchanged(market, max_workers):
+    prices, growth_rates = market
+    with pytest.raises(ZeroDivisionError, match="broken transform"):
+        ParameterSweep(prices, growth_rates, max_workers=max_workers).run([{"transform": failing_transform}])
+
+
+def test_error_raised_while_holding_views_of_the_shared_prices_is_not_hidden(market, monkeypatch):
+    def failing_variant(variant):
+        shared_prices = parameter_sweep._SHARED_DATA["prices"][1:]
+        raise FloatingPointError(f"broken variant over {shared_prices.shape}")
+
+    monkeypatch.setattr(parameter_sweep, "_run_variant", failing_variant)
+    prices, growth_rates = market
+    with pytest.raises(FloatingPointError, match="broken variant") as error:
+        ParameterSweep(prices, growth_rates, max_workers=1).run([{"name": "all"}])
+    assert "shared_prices" not in error.traceback[-1].frame.f_locals
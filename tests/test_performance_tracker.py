@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from growth_ptf_maker.data_providers import SyntheticDataProvider
+from growth_ptf_maker.performance_tracker import PerformanceTracker
+from growth_ptf_maker.returns_engine import ReturnsEngine
+
+
+class IntradayProvider(SyntheticDataProvider):
+    """Serve the synthetic prices up to a cut-off date, with a partial print for the session of today"""
+
+    def __init__(self, available_until):
+        super().__init__(seed=2)
+        self.available_until = pd.Timestamp(available_until)
+        self.today_price = 1.0
+
+    def get_prices(self, ticker, start_date, end_date=None):
+        end_date = min(self.parse_date(end_date), self.available_until)
+        prices = super().get_prices(ticker, start_date, end_date)
+        today = self.parse_date(None)
+        if self.available_until >= today >= self.parse_date(start_date) and today <= end_date:
+            prices = pd.concat([prices.loc[prices["Date"] < today],
+                                pd.DataFrame({"Date": [today], "Adj Close": [self.today_price]})], ignore_index=True)
+        return prices
+
+
+@pytest.fixture
+def weights():
+    tickers = SyntheticDataProvider().get_tickers(3)
+    return pd.DataFrame(index=tickers, data={"weights": [0.4, -0.3, 0.2]})
+
+
+def recompute(provider, weights, start_date, end_date):
+    histories = provider.get_many_prices(weights.index.tolist(), start_date, end_date)
+    panel = pd.DataFrame({ticker: history.set_index("Date")["Adj Close"] for ticker, history in histories.items()})
+    _, portfolio, portfolio_dollars = ReturnsEngine.calculate(panel.to_numpy(), weights["weights"].to_numpy())
+    return pd.DataFrame({"Portfolio": portfolio, "Portfolio_Dollars": portfolio_dollars}, index=panel.index)
+
+
+def test_update_matches_a_full_recompute_without_the_partial_session(tmp_path, weights):
+    today = pd.Timestamp.today().normalize()
+    start_date = today - pd.Timedelta(days=120)
+    provider = IntradayProvider(today - pd.Timedelta(days=40))
+    tracker = PerformanceTracker(str(start_date), weights, provider, str(tmp_path / "state.pickled"))
+
+    provider.available_until = today
+    tracker.update()
+    provider.today_price = 2.0
+    tracker.update()
+
+    expected = recompute(provider, weights, start_date, today - pd.Timedelta(days=1))
+    pd.testing.assert_frame_equal(tracker.portfolio_returns(), expected, check_freq=False, check_names=False)
+    assert tracker.get_last_level() == pytest.approx(expected["Portfolio_Dollars"].iloc[-1])
+    assert today not in tracker.portfolio_returns().index
+
+
+def test_stream_prices_today_against_the_last_close(tmp_path, weights):
+    today = pd.Timestamp.today().normalize()
+    provider = IntradayProvider(today)
+    tracker = PerformanceTracker(str(today - pd.Timedelta(days=30)), weights, provider, str(tmp_path / "state.pickled"))
+    closes = provider.get_many_prices(weights.index.tolist(), today - pd.Timedelta(days=10),
+                                      today - pd.Timedelta(days=1))
+    last_closes = pd.Series({ticker: history["Adj Close"].iloc[-1] for ticker, history in closes.items()})
+
+    value = next(tracker.stream([(today, (last_closes * 1.01).to_dict())]))
+
+    expected = np.prod(1 + 0.01 * weights["weights"].to_numpy())
+    assert value["Portfolio"] == pytest.approx(expected)
+    assert value["Portfolio_Dollars"] == pytest.approx(tracker.get_last_level() * expected)
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from growth_ptf_maker.data_providers import SyntheticDataProvider
+from growth_ptf_maker.market_data import MarketData
+from growth_ptf_maker.portfolio_analytics import PortfolioAnalytics
+
+
+class FakeBackTest:
+
+    def __init__(self, dates):
+        self.__results = pd.DataFrame(index=pd.DatetimeIndex(dates, name="Date"),
+                                      data={"Portfolio": 1.0, "Portfolio_Dollars": 100.0}, dtype=float)
+
+    def get_back_test_results(self):
+        return self.__results
+
+    def get_weights(self):
+        return pd.DataFrame(index=["AAA"], data={"weights": [0.1]})
+
+
+def test_benchmarks_are_based_to_100_on_the_first_date():
+    dates = pd.bdate_range(pd.Timestamp.today().normalize() - pd.Timedelta(days=60), periods=20)
+    market_data = MarketData(str(dates[0]), data_provider=SyntheticDataProvider())
+
+    chart_data = PortfolioAnalytics({"AAA": 0.1}, FakeBackTest(dates), 1, market_data).get_chart_data()
+
+    benchmark = chart_data["performance_vs_benchmark"]["data"]["DJIA"]
+    assert benchmark.iloc[0] == 100 and benchmark.notna().all()
+
+
+def test_empty_back_test_gives_empty_charts():
+    market_data = MarketData("2020-01-01", data_provider=SyntheticDataProvider())
+
+    chart_data = PortfolioAnalytics({"AAA": 0.1}, FakeBackTest([]), 1, market_data).get_chart_data()
+
+    assert chart_data["performance_vs_benchmark"]["data"].empty
+    assert chart_data["tracking_error"]["data"].empty
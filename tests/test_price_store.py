@@ -0,0 +1,101 @@
+import json
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from growth_ptf_maker.instrumentation import Metrics
+from growth_ptf_maker.price_store import PriceStore
+
+from conftest import make_prices
+
+TODAY = pd.Timestamp(datetime.today()).normalize()
+
+
+def day(offset):
+    return (TODAY + pd.Timedelta(days=offset)).strftime("%Y-%m-%d")
+
+
+@pytest.fixture
+def metrics():
+    return Metrics()
+
+
+@pytest.fixture
+def store(tmp_path, metrics):
+    return PriceStore(str(tmp_path / "price_store"), metrics=metrics)
+
+
+def covered_end(store, ticker):
+    with open(f"{store.get_store_path()}/coverage.json") as coverage_file:
+        return pd.Timestamp(json.load(coverage_file)[ticker]["end"])
+
+
+def assert_same_prices(prices, expected):
+    np.testing.assert_array_equal(prices["Date"].to_numpy(), expected["Date"].to_numpy())
+    np.testing.assert_allclose(prices["Adj Close"], expected["Adj Close"], rtol=1e-9)
+
+
+def test_top_up_rebases_the_stored_prices_after_a_dividend(yahoo, store, metrics):
+    history = make_prices(pd.date_range(day(-100), day(0)))
+    yahoo.prices["AAA"] = history.loc[history["Date"] <= day(-10)]
+    store.get_prices("AAA", day(-60))
+    assert covered_end(store, "AAA") == pd.Timestamp(day(-10))
+    adjusted = history.copy()
+    adjusted.loc[adjusted["Date"] < day(-5), "Adj Close"] *= 0.97
+    yahoo.prices["AAA"] = adjusted
+    prices = store.get_prices("AAA", day(-60))
+    assert_same_prices(prices, adjusted.loc[adjusted["Date"] >= day(-60)])
+    assert metrics.get_results()["counters"]["price_store_rebases"] == 1
+
+
+def test_back_extension_rebases_the_stored_prices_after_a_split(yahoo, store):
+    history = make_prices(pd.date_range(day(-100), day(-20)))
+    yahoo.prices["AAA"] = history
+    store.get_prices("AAA", day(-40), day(-20))
+    split = history.assign(**{"Adj Close": history["Adj Close"] / 2})
+    yahoo.prices["AAA"] = split
+    prices = store.get_prices("AAA", day(-80), day(-20))
+    assert_same_prices(prices, split.loc[split["Date"] >= day(-80)])
+
+
+def test_unreconcilable_prices_are_downloaded_again(yahoo, store, metrics):
+    yahoo.prices["AAA"] = make_prices(pd.date_range(day(-100), day(-10)), seed=1)
+    store.get_prices("AAA", day(-60))
+    yahoo.prices["AAA"] = make_prices(pd.date_range(day(-100), day(0)), seed=2)
+    prices = store.get_prices("AAA", day(-60))
+    assert_same_prices(prices, yahoo.prices["AAA"].loc[yahoo.prices["AAA"]["Date"] >= day(-60)])
+    assert metrics.get_results()["counters"]["price_store_refetches"] == 1
+
+
+def test_todays_bar_is_downloaded_again(yahoo, store):
+    yahoo.prices["AAA"] = make_prices(pd.date_range(day(-30), day(0)))
+    store.get_prices("AAA", day(-20))
+    assert covered_end(store, "AAA") == pd.Timestamp(day(-1))
+    yahoo.prices["AAA"].loc[yahoo.prices["AAA"].index[-1], "Adj Close"] *= 1.01
+    prices = store.get_prices("AAA", day(-20))
+    assert_same_prices(prices, yahoo.prices["AAA"].loc[yahoo.prices["AAA"]["Date"] >= day(-20)])
+
+
+def test_covered_past_range_is_read_from_the_store(yahoo, store, metrics):
+    yahoo.prices["AAA"] = make_prices(pd.date_range(day(-100), day(-10)))
+    first = store.get_prices("AAA", day(-60), day(-20))
+    second = store.get_prices("AAA", day(-50), day(-30))
+    assert len(yahoo.requests) == 1
+    assert_same_prices(second, first.loc[(first["Date"] >= day(-50)) & (first["Date"] <= day(-30))])
+    assert metrics.get_results()["counters"]["price_store_hits"] == 1
+
+
+def test_parallel_top_up_rebases_each_ticker(yahoo, store):
+    histories = {ticker: make_prices(pd.date_range(day(-100), day(0)), seed=seed)
+                 for seed, ticker in enumerate(["AAA", "BBB"])}
+    for ticker, history in histories.items():
+        yahoo.prices[ticker] = history.loc[history["Date"] <= day(-10)]
+    store.get_many_prices(["AAA", "BBB"], day(-60))
+    histories["BBB"]["Adj Close"] *= 0.5
+    yahoo.prices.update(histories)
+    prices = store.get_many_prices(["AAA", "BBB"], day(-60))
+    for ticker, history in histories.items():
+        assert_same_prices(prices[ticker], history.loc[history["Date"] >= day(-60)])
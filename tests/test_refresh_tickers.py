@@ -0,0 +1,44 @@
+import json
+
+import pytest
+import requests
+
+from growth_ptf_maker.refresh_tickers import GetTickers
+
+CONSTITUENTS_PAGE = ("<html><body><table id='constituents'>" + "".join(
+    f"<tr><td><a href='/wiki/{ticker}'>Company {ticker}</a></td>"
+    f"<td><a rel='nofollow' href='https://www.nyse.com/quote/{ticker}'>{ticker}</a></td></tr>"
+    for ticker in ["AAPL", "KO", "MSFT"]) + "</table></body></html>")
+
+
+@pytest.fixture
+def wikipedia(monkeypatch):
+    page = {"content": CONSTITUENTS_PAGE}
+
+    def get(url, headers=None, timeout=None):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = page["content"].encode()
+        return response
+
+    monkeypatch.setattr(requests, "get", get)
+    return page
+
+
+def test_constituents_are_parsed_and_saved(wikipedia):
+    assert GetTickers().get_tickers() == ["AAPL", "KO", "MSFT"]
+    with open("djia_constituents.json") as saved_file:
+        assert json.load(saved_file)["tickers"] == ["AAPL", "KO", "MSFT"]
+
+
+def test_layout_change_falls_back_on_the_saved_constituents(wikipedia):
+    GetTickers()
+    wikipedia["content"] = "<html><body><table id='components'></table></body></html>"
+    assert GetTickers(revalidate_after_hours=0).get_tickers() == ["AAPL", "KO", "MSFT"]
+
+
+def test_layout_change_without_saved_constituents_raises(wikipedia):
+    wikipedia["content"] = "<html><body><p>Moved</p></body></html>"
+    with pytest.raises(ValueError):
+        GetTickers()
@@ -0,0 +1,58 @@
+import os
+import pickle
+
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+
+from growth_ptf_maker.ticker_list import GetTickers
+
+
+def letter_page(url, status_code=200):
+    letter = url.rstrip("/")[-1]
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = url
+    response._content = ("<html><body><dl class='dl-horizontal'>" +
+                         "".join(f"<dt>{letter}{i}</dt><dd>x</dd>" for i in range(2)) + "</dl></body></html>").encode()
+    return response
+
+
+@pytest.fixture
+def dividata(monkeypatch):
+    failing_letters = set()
+
+    def get(session, url, **kwargs):
+        if url.endswith(tuple(failing_letters)):
+            raise requests.ConnectionError(f"cannot reach {url}")
+        return letter_page(url)
+
+    monkeypatch.setattr(requests.Session, "get", get)
+    return failing_letters
+
+
+def test_all_pages_are_parsed_and_saved(dividata):
+    ticker_list = GetTickers(requests_per_second=1000)
+    assert ticker_list.get_downloaded_tickers()["Q"] == ["Q0", "Q1"]
+    assert ticker_list.get_missing_pages() == {}
+    assert os.path.exists("ticker_list.pickled")
+
+
+def test_failing_page_is_reported_without_aborting_the_scrape(dividata):
+    dividata.add("K")
+    ticker_list = GetTickers(requests_per_second=1000)
+    assert list(ticker_list.get_missing_pages()) == ["K"]
+    assert ticker_list.get_downloaded_tickers()["K"] == []
+    assert ticker_list.get_downloaded_tickers()["L"] == ["L0", "L1"]
+    assert not os.path.exists("ticker_list.pickled")
+
+
+def test_failing_page_keeps_the_stale_saved_tickers(dividata):
+    with open("ticker_list.pickled", "wb") as pickled_file:
+        pickle.dump({"as_of": datetime.now() - timedelta(days=30), "tickers": {"K": ["KO"], "L": ["LOW"]}},
+                    pickled_file)
+    dividata.add("K")
+    ticker_list = GetTickers(requests_per_second=1000)
+    assert ticker_list.get_downloaded_tickers()["K"] == ["KO"]
+    assert ticker_list.get_downloaded_tickers()["L"] == ["L0", "L1"]
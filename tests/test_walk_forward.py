@@ -0,0 +1,102 @@
+import sqlite3
+
+from contextlib import closing
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from growth_ptf_maker.data_providers import SyntheticDataProvider
+from growth_ptf_maker.growth_cache import GrowthCache
+from growth_ptf_maker.market_data import MarketData
+from growth_ptf_maker.walk_forward import WalkForwardBackTest
+
+TICKERS = ["AAA", "BBB", "CCC", "DDD"]
+CALLS = list()
+
+
+def rising_growth(tickers, as_of):
+    CALLS.append(("rising", as_of))
+    return {ticker: 0.01 * (rank + 1) for rank, ticker in enumerate(sorted(tickers))}
+
+
+def falling_growth(tickers, as_of):
+    CALLS.append(("falling", as_of))
+    return {ticker: -0.01 * (rank + 1) for rank, ticker in enumerate(sorted(tickers))}
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    CALLS.clear()
+
+
+@pytest.fixture
+def growth_cache(tmp_path):
+    return GrowthCache(str(tmp_path / "growth_cache.sqlite"))
+
+
+def walk_forward(growth_provider, growth_cache, frequency="monthly"):
+    market_data = MarketData("2021-01-01", "2021-12-31", data_provider=SyntheticDataProvider(seed=3))
+    return WalkForwardBackTest(TICKERS, growth_provider, "2021-01-01", "2021-12-31", frequency, market_data,
+                               growth_cache)
+
+
+def test_growth_rates_are_reused_from_the_cache(growth_cache):
+    first = walk_forward(rising_growth, growth_cache)
+    calls = len(CALLS)
+    second = walk_forward(rising_growth, growth_cache)
+    assert calls == 12 and len(CALLS) == calls
+    pd.testing.assert_frame_equal(first.get_back_test_results(), second.get_back_test_results())
+
+
+def test_growth_providers_do_not_share_the_cache(growth_cache):
+    rising = walk_forward(rising_growth, growth_cache).get_weights_history()
+    falling = walk_forward(falling_growth, growth_cache).get_weights_history()
+    assert [provider for provider, _ in CALLS].count("falling") == 12
+    assert (rising["DDD"] > 0).all() and (falling["DDD"] < 0).all()
+
+
+def test_unnamed_growth_providers_are_not_cached(growth_cache, tmp_path):
+    def local_growth(tickers, as_of):
+        return rising_growth(tickers, as_of)
+
+    for growth_provider in [lambda tickers, as_of: rising_growth(tickers, as_of), local_growth]:
+        for _ in range(2):
+            walk_forward(growth_provider, growth_cache)
+    assert len(CALLS) == 4 * 12
+    with closing(sqlite3.connect(tmp_path / "growth_cache.sqlite")) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM growth_parameters").fetchone() == (0,)
+
+
+def test_unnamed_growth_providers_are_cached_under_a_given_namespace(growth_cache):
+    market_data = MarketData("2021-01-01", "2021-12-31", data_provider=SyntheticDataProvider(seed=3))
+    for _ in range(2):
+        WalkForwardBackTest(TICKERS, lambda tickers, as_of: rising_growth(tickers, as_of), "2021-01-01", "2021-12-31",
+                            market_data=market_data, growth_cache=growth_cache, growth_namespace="walk_forward:rising")
+    assert len(CALLS) == 12
+
+
+def test_walk_forward_growth_rates_are_not_fresh_ggm_growth_rates(growth_cache):
+    walk_forward(rising_growth, growth_cache)
+    growth_cache.save_growth_rates({"AAA": 0.5}, date.today(), "walk_forward:other")
+    assert growth_cache.get_fresh_growth_rates(TICKERS) == {}
+    assert growth_cache.get_fresh_growth_rates(TICKERS, namespace="walk_forward:other") == {"AAA": 0.5}
+
+
+def test_holdings_drift_between_rebalances(growth_cache):
+    back_test = walk_forward(rising_growth, growth_cache, "quarterly")
+    results = back_test.get_back_test_results()
+    weights_history = back_test.get_weights_history()
+    prices = SyntheticDataProvider(seed=3).get_many_prices(TICKERS, "2021-01-01", "2021-12-31")
+    prices = pd.DataFrame({ticker: history.set_index("Date")["Adj Close"] for ticker, history in prices.items()})
+    cash = pd.Series(1.0, index=TICKERS)
+    units = pd.Series(0.0, index=TICKERS)
+    expected = [1.0]
+    for previous_date, current_date in zip(prices.index[:-1], prices.index[1:]):
+        if previous_date in weights_history.index:
+            units = weights_history.loc[previous_date] / prices.loc[previous_date]
+            cash = 1 - weights_history.loc[previous_date]
+        sleeves = cash + units * prices.loc[previous_date]
+        expected.append(np.prod((cash + units * prices.loc[current_date]) / sleeves))
+    np.testing.assert_allclose(results["Portfolio"].to_numpy(), expected, rtol=1e-10)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from growth_ptf_maker.concurrent_downloader import ConcurrentDownloader
+from growth_ptf_maker.instrumentation import Metrics
+from growth_ptf_maker.yahoo_data_downloader import YahooFinanceDownloader
+
+from conftest import make_prices
+
+
+@pytest.fixture
+def prices(yahoo):
+    yahoo.prices["AAA"] = make_prices(pd.bdate_range("2021-01-04", "2021-06-30"))
+    return yahoo.prices["AAA"]
+
+
+def test_streamed_body_is_parsed_with_the_requested_columns(prices):
+    downloader = YahooFinanceDownloader("AAA", "2021-01-01", "2021-07-01", columns=YahooFinanceDownloader.PRICE_COLUMNS,
+                                        price_dtype="float32", stream=True)
+    parsed = downloader.get_parsed_results()
+    assert downloader.get_raw_results() is None
+    assert parsed["Date"].dtype.kind == "M"
+    assert parsed["Adj Close"].dtype == np.float32
+    np.testing.assert_allclose(parsed["Adj Close"], prices["Adj Close"], rtol=1e-6)
+
+
+def test_streamed_and_buffered_bodies_match(prices):
+    streamed = YahooFinanceDownloader("AAA", "2021-01-01", "2021-07-01", stream=True).get_parsed_results()
+    buffered = YahooFinanceDownloader("AAA", "2021-01-01", "2021-07-01").get_parsed_results()
+    pd.testing.assert_frame_equal(streamed, buffered)
+
+
+def test_truncated_streamed_body_raises_a_request_exception(yahoo, prices):
+    yahoo.failures["AAA"] = ["truncated"]
+    with pytest.raises(requests.RequestException):
+        YahooFinanceDownloader("AAA", "2021-01-01", "2021-07-01", columns=YahooFinanceDownloader.PRICE_COLUMNS,
+                               stream=True)
+
+
+def test_truncated_streamed_body_is_retried(yahoo, prices):
+    yahoo.failures["AAA"] = ["truncated"]
+    metrics = Metrics()
+    downloader = ConcurrentDownloader(["AAA"], "2021-01-01", "2021-07-01", backoff=0, metrics=metrics,
+                                      columns=YahooFinanceDownloader.PRICE_COLUMNS, stream=True)
+    assert downloader.get_failures() == {}
+    assert len(downloader.get_parsed_results()["AAA"]) == len(prices)
+    assert metrics.get_results()["counters"]["download_retries"] == 1